@@ -7,24 +7,18 @@ Wrapper supporting discord buttons feature.
 @copyright 2021
 """
 
-import logging
-from sys import stdout
-
+from . import instrumentation
 from .patch import update
 from .context import ButtonContext
+from .component import ActionRow
 from .button import *
 from .client import *
-from .message import ComponentMessage
+from .dispatcher import ButtonDispatcher
+from .broadcast import BroadcastError, broadcast
+from .message import ComponentMessage, LazyComponentMessage, ComponentMessageCache
+from .partial import PartialGuild, PartialChannel
+from .waiter import ClickWaiters
+from .stream import ClickStream
+from .instrumentation import setup_logging, set_tracer
 
 update()    # Replace features in discord.py to support buttons feature.
-
-btn_logger = logging.getLogger('discord_buttons')
-btn_logger.setLevel(logging.DEBUG)  # On development, DEBUG. On release, INFO
-console_handler = logging.StreamHandler(stdout)
-console_handler.setFormatter(
-    logging.Formatter(
-        style='{',
-        fmt='[{asctime}] [{levelname}] {name}: {message}'
-    )
-)
-btn_logger.addHandler(console_handler)
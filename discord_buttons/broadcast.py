@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from typing import Optional, List, Union, Iterable, AsyncIterator
+
+import discord
+from aiohttp.payload import BytesPayload
+from discord import Client, Embed, AllowedMentions
+from discord.abc import Messageable
+from discord.http import Route
+
+from discord_buttons.component import Component
+from discord_buttons.message import ComponentMessage, ComponentMessageCache
+from discord_buttons.partial import PartialChannel
+from discord_buttons.patch import _pack_rows, _dump_payload, _cache_message
+from discord_buttons.type_hints import JSON
+
+__all__ = (
+    'BroadcastError',
+    'broadcast'
+)
+
+btn_logger = getLogger('discord_buttons')
+
+_DONE = object()    # Sentinel marking that a worker is finished.
+
+
+class BroadcastError(discord.DiscordException):
+    """Failure of sending broadcast message to a channel. Yielded by :func:`broadcast` instead of being raised."""
+
+    def __init__(self, channel: Messageable, original: Exception):
+        super(BroadcastError, self).__init__('Failed to broadcast message to channel {} : {!r}'.format(channel.id, original))
+        self.channel: Messageable = channel
+        self.original: Exception = original
+
+
+async def broadcast(
+        client: Client,
+        channels: Iterable[Union[Messageable, int]],
+        content: Optional[str] = None,
+        *,
+        embed: Optional[Embed] = None,
+        tts: bool = False,
+        allowed_mentions: Optional[AllowedMentions] = None,
+        components: Optional[List[Union[Component, List[Component]]]] = None,
+        concurrency: int = 10
+) -> AsyncIterator[Union[ComponentMessage, BroadcastError]]:
+    """
+    Send the same message to many channels.
+    Payload is serialized once and the encoded body is shared by every request. Requests run on up to
+    ``concurrency`` workers, and discord.py's per-route locks keep each channel's rate limit bucket in order.
+
+    Usage::
+
+        async for result in broadcast(client, channel_ids, 'Announcement!', components=[btn]):
+            if isinstance(result, BroadcastError):
+                ...
+
+    :param client: discord.py client to send messages with.
+    :param channels: channel objects or channel ids. Ids of channels not cached are sent to through PartialChannel.
+    :param concurrency: maximum number of requests in flight.
+    :return: async iterator of sent ComponentMessage, or BroadcastError of failed channels, in completion order.
+    """
+    if concurrency <= 0:
+        raise ValueError('broadcast concurrency must be a positive integer.')
+    state = client._connection
+
+    payload: JSON = {}
+    if content is not None:
+        payload['content'] = str(content)
+    if tts:
+        payload['tts'] = True
+    if embed is not None:
+        payload['embed'] = embed.to_dict()
+    if allowed_mentions is not None:
+        if state.allowed_mentions is not None:
+            payload['allowed_mentions'] = state.allowed_mentions.merge(allowed_mentions).to_dict()
+        else:
+            payload['allowed_mentions'] = allowed_mentions.to_dict()
+    elif state.allowed_mentions is not None:
+        payload['allowed_mentions'] = state.allowed_mentions.to_dict()
+    body: bytes = _dump_payload(payload, _pack_rows(components) if components else None)
+
+    pending = iter(channels)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def work():
+        for channel in pending:
+            if isinstance(channel, int):
+                channel = client.get_channel(channel) or PartialChannel(state, channel)
+            try:
+                route = Route('POST', '/channels/{channel_id}/messages', channel_id=channel.id)
+                data: JSON = await state.http.request(route, data=BytesPayload(body, content_type='application/json'))
+                message: ComponentMessage = ComponentMessage(state=state, channel=channel, data=data)
+                _cache_message(state, message)
+                ComponentMessageCache().add(message)
+                results.put_nowait(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                btn_logger.debug('broadcast : failed to send message to channel %s : %r', channel.id, e)
+                results.put_nowait(BroadcastError(channel, e))
+        results.put_nowait(_DONE)
+
+    workers: List[asyncio.Task] = [asyncio.ensure_future(work()) for _ in range(concurrency)]
+    try:
+        running: int = len(workers)
+        while running:
+            result = await results.get()
+            if result is _DONE:
+                running -= 1
+            else:
+                yield result
+    finally:
+        for worker in workers:
+            worker.cancel()
@@ -1,8 +1,13 @@
 from __future__ import annotations
 import asyncio
-from contextlib import suppress
+import heapq
+import weakref
+from collections import OrderedDict
 from enum import Enum
-from typing import Optional, List, Tuple, ClassVar, Dict
+from functools import partial
+from sys import getsizeof
+from time import monotonic
+from typing import Optional, List, Tuple, ClassVar, Dict, Union, Any
 from logging import getLogger
 
 import discord
@@ -16,10 +21,15 @@ __all__ = (
     'ButtonCache'
 )
 
-from discord_buttons.utils import SingletonMeta
+from discord_buttons.utils import SingletonMeta, PrefixTree
+from discord_buttons.stream import ClickStream
+from discord_buttons.waiter import ClickWaiters
 
 btn_logger = getLogger('discord_buttons')
 
+# Default of optional arguments where None is a meaningful value.
+_MISSING: Any = object()
+
 
 class ButtonStyle(Enum):
     Blurple = 1
@@ -30,38 +40,216 @@ class ButtonStyle(Enum):
     Link = URL
 
     @classmethod
-    def parse(cls, value: int):
-        btn_logger.debug('ButtonStyle(Enum) : Try parsing value {} into ButtonStyle enumeration object.'.format(value))
-        filtered = filter(
-            lambda x: x.value == value,
-            cls.__members__.values()
-        )
-        with suppress(StopIteration):
-            enum = next(filtered)
-            btn_logger.debug('ButtonStyle(Enum) : Parsed enumerate object using filter + next() : {}.'.format(enum))
-            if enum is None:
-                raise ValueError('Invalid value is passed in ButtonStyle.parse(value) : {} is not a valid button style integer.'.format(value))
-            return enum
+    def parse(cls, value: int) -> ButtonStyle:
+        style: Optional[ButtonStyle] = _BUTTON_STYLES.get(value)
+        if style is None:
+            raise ValueError('Invalid value is passed in ButtonStyle.parse(value) : {} is not a valid button style integer.'.format(value))
+        return style
+
+
+_BUTTON_STYLES: Dict[int, ButtonStyle] = {member.value: member for member in ButtonStyle}
 
 
 class ButtonCache(metaclass=SingletonMeta):
+    """
+    Registry of buttons, keyed by custom_id.
+    Buttons can be registered for an exact custom_id, or for a prefix route (e.g. 'vote:') which serves every
+    custom_id starting with it (e.g. 'vote:<poll_id>:<option>'). Exact matches take precedence over routes,
+    and the longest matching route wins.
+
+    Exact entries are unbounded by default. Use :meth:`configure` to bound them by size (least recently used
+    entries are evicted first), expire them after a ttl, or hold them through weak references.
+    """
     __slots__ = (
-        'cache'
+        'cache',
+        'routes',
+        'max_size',
+        'ttl',
+        'weak',
+        'hits',
+        'misses',
+        'evictions',
+        '_expires',
+        '_expiry_heap'
     )
 
-    cache: Dict[str, Button]
+    cache: OrderedDict[str, Union[Button, weakref.ref]]
+    routes: PrefixTree
 
     def __init__(self):
-        self.cache: Dict[str, Button] = {}
+        self.cache: OrderedDict[str, Union[Button, weakref.ref]] = OrderedDict()
+        self.routes: PrefixTree = PrefixTree()
+        self.max_size: Optional[int] = None
+        self.ttl: Optional[float] = None
+        self.weak: bool = False
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._expires: Dict[str, float] = {}
+        # (expires, custom_id) min-heap, so expired entries are swept without scanning every entry.
+        # Entries replaced or removed since they were pushed are stale, and skipped when popped.
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+    def configure(
+            self,
+            *,
+            max_size: Optional[int] = _MISSING,
+            ttl: Optional[float] = _MISSING,
+            weak: bool = _MISSING
+    ) -> None:
+        """
+        Configure bounds of exact custom_id entries. Routes are never evicted. Options not passed are kept as they are.
+        :param max_size: maximum number of entries. Least recently used entries are evicted beyond it. None for no limit.
+        :param ttl: default lifetime of newly registered entries in seconds. None for no expiry.
+        :param weak: hold newly registered buttons through weak references, so they are dropped with their last
+                     strong reference (e.g. the message view that created them).
+        """
+        if max_size is not _MISSING:
+            if max_size is not None and max_size <= 0:
+                raise ValueError('ButtonCache.max_size must be a positive integer.')
+            self.max_size = max_size
+        if ttl is not _MISSING:
+            self.ttl = ttl
+        if weak is not _MISSING:
+            self.weak = weak
+        self._trim()
 
     def get_button(self, custom_id: str) -> Optional[Button]:
-        return self.cache.get(custom_id)
+        btn: Optional[Button] = self._get_entry(custom_id)
+        if btn is None and len(self.routes):
+            matched = self.routes.longest_prefix(custom_id)
+            if matched is not None:
+                btn = matched[1]
+        if btn is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return btn
 
     def get_buttons(self) -> Tuple[Button, ...]:
-        return tuple(self.cache.values())
+        buttons = (self._get_entry(custom_id) for custom_id in tuple(self.cache))
+        return tuple(btn for btn in buttons if btn is not None) + tuple(btn for _, btn in self.routes.items())
+
+    def register_button(self, custom_id: str, button: Button, ttl: Optional[float] = None) -> None:
+        """
+        Register button for an exact custom_id.
+        :param custom_id: custom_id of the button.
+        :param button: Button object.
+        :param ttl: lifetime of this entry in seconds. Defaults to ButtonCache.ttl.
+        """
+        if self.weak:
+            self.cache[custom_id] = weakref.ref(button, partial(self._on_collected, custom_id))
+        else:
+            self.cache[custom_id] = button
+        self.cache.move_to_end(custom_id)
+
+        now: float = monotonic()
+        ttl = ttl if ttl is not None else self.ttl
+        if ttl is not None:
+            expires: float = now + ttl
+            self._expires[custom_id] = expires
+            heapq.heappush(self._expiry_heap, (expires, custom_id))
+        else:
+            self._expires.pop(custom_id, None)
+        self._sweep(now)
+        self._trim()
+
+    def unregister_button(self, custom_id: str) -> Optional[Button]:
+        entry = self.cache.pop(custom_id, None)
+        self._expires.pop(custom_id, None)
+        if isinstance(entry, weakref.ref):
+            entry = entry()
+        return entry
+
+    def register_route(self, prefix: str, button: Button) -> None:
+        """
+        Register button as a handler of every custom_id starting with given prefix.
+        :param prefix: custom_id prefix to route.
+        :param button: Button object whose callback handles the route.
+        """
+        if not prefix:
+            raise ValueError('Route prefix must be a non-empty string.')
+        self.routes.insert(prefix, button)
+
+    def unregister_route(self, prefix: str) -> Optional[Button]:
+        return self.routes.remove(prefix)
+
+    def purge_expired(self) -> int:
+        """
+        Evict every expired entry.
+        :return: number of evicted entries.
+        """
+        now = monotonic()
+        expired = [custom_id for custom_id, expires in self._expires.items() if expires <= now]
+        for custom_id in expired:
+            self._evict(custom_id)
+        return len(expired)
+
+    def stats(self) -> JSON:
+        """
+        Return counters and approximate memory held by exact entries, to size the cache in production.
+        Approximate bytes counts the cache tables, keys, and strongly held buttons with their labels and urls.
+        """
+        size = getsizeof(self.cache) + getsizeof(self._expires)
+        for custom_id, entry in self.cache.items():
+            size += getsizeof(custom_id) + getsizeof(entry)
+            if not isinstance(entry, weakref.ref):
+                # Weakly referenced buttons are owned elsewhere.
+                size += getsizeof(entry.label) + (getsizeof(entry.url) if entry.url else 0)
+        return {
+            'size': len(self.cache),
+            'routes': len(self.routes),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'approximate_bytes': size
+        }
+
+    def _get_entry(self, custom_id: str) -> Optional[Button]:
+        entry = self.cache.get(custom_id)
+        if entry is None:
+            return None
+        if self._expires:
+            expires = self._expires.get(custom_id)
+            if expires is not None and expires <= monotonic():
+                self._evict(custom_id)
+                return None
+        if isinstance(entry, weakref.ref):
+            entry = entry()
+            if entry is None:
+                self._evict(custom_id)
+                return None
+        if self.max_size is not None:
+            self.cache.move_to_end(custom_id)
+        return entry
+
+    def _sweep(self, now: float) -> None:
+        """
+        Evict entries expired by now. Called on every registration, so entries which are never looked up again
+        (e.g. buttons of old messages) don't accumulate. Each pushed expiry is popped once, so it is amortized O(log n).
+        """
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires, custom_id = heapq.heappop(heap)
+            if self._expires.get(custom_id) == expires:
+                self._evict(custom_id)
+
+    def _evict(self, custom_id: str) -> None:
+        if self.cache.pop(custom_id, None) is not None:
+            self.evictions += 1
+        self._expires.pop(custom_id, None)
+
+    def _trim(self) -> None:
+        if self.max_size is None:
+            return
+        while len(self.cache) > self.max_size:
+            custom_id, _ = self.cache.popitem(last=False)
+            self._expires.pop(custom_id, None)
+            self.evictions += 1
 
-    def register_button(self, custom_id: str, button: Button) -> None:
-        self.cache[custom_id] = button
+    def _on_collected(self, custom_id: str, ref: weakref.ref) -> None:
+        if self.cache.get(custom_id) is ref:
+            self._evict(custom_id)
 
 
 class Button(Component):
@@ -69,18 +257,37 @@ class Button(Component):
     style: ButtonStyle
     custom_id: Optional[str]
     url: Optional[str]
-    __slots__ = ('label', 'style', 'custom_id', 'url', '_callback')
+    disabled: bool
+    max_concurrency: Optional[int]
+    __slots__ = ('label', 'style', 'custom_id', 'url', 'disabled', 'max_concurrency', '_callback', '_streams')
 
     @classmethod
     def from_json(
             cls,
-            data: JSON
+            data: JSON,
+            register: bool = True
     ):
         label: str = data['label']
         style: int = data['style']
         custom_id: Optional[str] = data.get('custom_id')
         url: Optional[str] = data.get('url')
-        return cls(label, ButtonStyle.parse(style), custom_id, url)
+        return cls(label, ButtonStyle.parse(style), custom_id, url, register=register, disabled=data.get('disabled', False))
+
+    @classmethod
+    def view(
+            cls,
+            label: str,
+            style: ButtonStyle,
+            custom_id: Optional[str] = None,
+            url: Optional[str] = None,
+            disabled: bool = False
+    ) -> Button:
+        """
+        Build a non-registered button without running __init__. Used to decode buttons of received messages.
+        """
+        self = cls.__new__(cls)
+        self._init_fields(label, style, custom_id or None, url or None, disabled, None)
+        return self
 
     # Experimental
     @classmethod
@@ -93,22 +300,46 @@ class Button(Component):
             label: str,
             style: ButtonStyle,
             custom_id: Optional[str]=None,
-            url: Optional[str]=None
+            url: Optional[str]=None,
+            *,
+            register: bool = True,
+            disabled: bool = False,
+            max_concurrency: Optional[int] = None
     ):
-        super(Button, self).__init__(type=ComponentType.Button)
-        self.label = label if isinstance(label, str) else str(label)
-        self.style = style  # Raw value must be parsed in Button.fromJson()
-        self.custom_id = custom_id or None
-        self.url = url or None
-        if self.custom_id is not None and self.url is not None:
+        if custom_id and url:
             raise ValueError('Button object can have either custom_id (color styles) or url (style==url).')
-        self._callback: Optional[CoroutineFunction] = None
+        # Raw style value must be parsed in Button.from_json()
+        self._init_fields(label if isinstance(label, str) else str(label), style, custom_id or None, url or None, disabled, max_concurrency)
 
-        if self.custom_id:
+        # Buttons parsed from received messages are only views, so they must not replace registered handlers.
+        if self.custom_id and register:
             ButtonCache().register_button(self.custom_id, self)
 
-    def to_json(self) -> JSON:
-        data = super(Button, self).to_json()
+    def _init_fields(
+            self,
+            label: str,
+            style: ButtonStyle,
+            custom_id: Optional[str],
+            url: Optional[str],
+            disabled: bool,
+            max_concurrency: Optional[int]
+    ) -> None:
+        """Set every slot of the button. Shared by __init__ and Button.view, so both always build the same fields."""
+        set_field = object.__setattr__    # Serialization cache is empty yet, so no need to invalidate it.
+        set_field(self, 'type', ComponentType.Button)
+        set_field(self, '_json', None)
+        set_field(self, '_json_bytes', None)
+        set_field(self, 'label', label)
+        set_field(self, 'style', style)
+        set_field(self, 'custom_id', custom_id)
+        set_field(self, 'url', url)
+        set_field(self, 'disabled', disabled)
+        set_field(self, 'max_concurrency', max_concurrency)  # Limit of concurrent callbacks when dispatched with ButtonDispatcher.
+        set_field(self, '_callback', None)
+        set_field(self, '_streams', None)    # Open ClickStreams. Created on first Button.clicks().
+
+    def _build_json(self) -> JSON:
+        data = super(Button, self)._build_json()
         data.update({
             'style': self.style.value,
             'label': self.label
@@ -117,6 +348,8 @@ class Button(Component):
             data['custom_id'] = self.custom_id
         if self.url:
             data['url'] = self.url
+        if self.disabled:
+            data['disabled'] = True
         return data
 
     def __repr__(self) -> str:
@@ -135,8 +368,57 @@ class Button(Component):
 
         self._callback = callback
 
+    async def wait_for_click(
+            self,
+            message: Optional[Union[discord.abc.Snowflake, int]] = None,
+            user: Optional[Union[discord.abc.Snowflake, int]] = None,
+            timeout: Optional[float] = None
+    ) -> 'ButtonContext':
+        """
+        Wait for a click on this button.
+        :param message: message (or message id) the button should be clicked on. None matches any message.
+        :param user: user (or user id) who should click the button. None matches anyone.
+        :param timeout: seconds to wait before raising asyncio.TimeoutError. None waits forever.
+        :return: ButtonContext of the click.
+        """
+        if self.custom_id is None:
+            raise ValueError('Link buttons do not receive clicks.')
+        message_id: Optional[int] = message if message is None or isinstance(message, int) else message.id
+        return await ClickWaiters().wait(message_id, self.custom_id, user, timeout)
+
+    def clicks(self, maxsize: int = 100, overflow: str = 'drop_oldest') -> ClickStream:
+        """
+        Open an async iterator of this button's clicks. Clicks are buffered until consumed.
+        Streams receive clicks along with the callback. If the button has no callback, responding to buffered
+        clicks is left to the consumer (or to the client's ``auto_defer`` option).
+        :param maxsize: maximum number of buffered clicks.
+        :param overflow: 'drop_oldest' or 'drop_newest'. Policy applied when the buffer is full.
+        :return: ClickStream. Close it (or use it as async context manager) to stop buffering.
+        """
+        if self.custom_id is None:
+            raise ValueError('Link buttons do not receive clicks.')
+        stream: ClickStream = ClickStream(self, maxsize, overflow)
+        if self._streams is None:
+            self._streams = weakref.WeakSet()
+        self._streams.add(stream)
+        return stream
+
+    def leaves_response(self, ctx: 'ButtonContext') -> bool:
+        """
+        True if invoke returns without answering the click, since the button has no callback and the click is handed
+        to click streams or to a resolved wait_for_click. Their consumer answers it instead.
+        """
+        return self._callback is None and (bool(self._streams) or ctx.waited)
+
+    def _remove_stream(self, stream: ClickStream) -> None:
+        if self._streams is not None:
+            self._streams.discard(stream)
+
     async def invoke(self, ctx: 'ButtonContext'):
+        if self._streams:
+            for stream in tuple(self._streams):
+                stream.put(ctx)
         if self._callback is not None:
             return await self._callback(ctx)
-        else:
+        elif not self.leaves_response(ctx):
             return await ctx.respond()
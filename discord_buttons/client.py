@@ -1,5 +1,5 @@
-import json
-from typing import List, Optional
+import logging
+from typing import List, Optional, Union, Callable, Hashable
 from logging import getLogger
 
 import discord
@@ -8,8 +8,15 @@ from discord.abc import Messageable
 from discord.ext.commands.bot import BotBase
 from discord.http import Route
 
-from discord_buttons import Button, ButtonCache, ButtonContext
-from discord_buttons.message import ComponentMessage
+from discord_buttons import Button, ButtonCache, ButtonContext, ButtonStyle, utils, instrumentation
+from discord_buttons.broadcast import broadcast
+from discord_buttons.dispatcher import ButtonDispatcher
+from discord_buttons.http import InteractionHTTPClient
+from discord_buttons.interactions import InteractionIndex, InteractionRecord, InteractionPayload
+from discord_buttons.message import LazyComponentMessage
+from discord_buttons.partial import PartialGuild, PartialChannel
+from discord_buttons.timer import TimerWheel, TimerHandle
+from discord_buttons.waiter import ClickWaiters
 from discord_buttons.type_hints import JSON
 
 __all__ = (
@@ -24,67 +31,206 @@ btn_logger = getLogger('discord_buttons')
 
 class ButtonHandler:
     def __init__(self, *args, **kwargs):
+        """
+        Keyword arguments for button dispatching. Others are passed to discord.py's client.
+        :param dispatch_workers: If set, button callbacks run on a ButtonDispatcher with this many workers.
+                                 Otherwise, each click runs in its own task.
+        :param dispatch_queue_size: maximum number of clicks waiting for a worker.
+        :param dispatch_overflow: 'drop' or 'defer'. Policy applied when dispatcher's queue is full.
+        :param dispatch_serialize_by: 'message', 'user', 'custom_id' or a function called with (button, payload).
+                                      Clicks with the same key run one at a time in arrival order, and different keys
+                                      run in parallel. Implies a ButtonDispatcher (16 workers unless dispatch_workers).
+        :param auto_defer: If set, interactions not responded within this many seconds are answered with
+                           DeferredChannelMessageWithSource, and later response edits it.
+        :param stateless: If True, guild, channel and member of interactions are always built from the payload,
+                          so button clicks can be handled with guild, member and channel caches disabled.
+        """
+        workers: Optional[int] = kwargs.pop('dispatch_workers', None)
+        queue_size: int = kwargs.pop('dispatch_queue_size', 1000)
+        overflow: str = kwargs.pop('dispatch_overflow', 'drop')
+        serialize_by: Optional[Union[str, Callable[..., Hashable]]] = kwargs.pop('dispatch_serialize_by', None)
+        auto_defer: Optional[float] = kwargs.pop('auto_defer', None)
+        stateless: bool = kwargs.pop('stateless', False)
+        super(ButtonHandler, self).__init__(*args, **kwargs)
         self.buttons: List[Button] = []
+        self.dispatcher: Optional[ButtonDispatcher] = None
+        if workers is not None or serialize_by is not None:
+            self.dispatcher = ButtonDispatcher(
+                self._run_button_interaction, workers or 16, queue_size, overflow, serialize_by
+            )
+        self.auto_defer: Optional[float] = auto_defer
+        self.stateless: bool = stateless
+        self.interaction_http: InteractionHTTPClient = InteractionHTTPClient(
+            user_agent=self.http.user_agent,
+            proxy=self.http.proxy,
+            proxy_auth=self.http.proxy_auth
+        )
+        self.interactions: InteractionIndex = InteractionIndex(self.interaction_http)
+        self.timer_wheel: TimerWheel = TimerWheel()
 
-    async def on_socket_response(self, msg: JSON):
+    def _get_state(self, **options):
         """
-        Event handler for socket response event in discord.py
-        :param msg: gateway payload received in discord.py client's websocket.
+        Hook 'INTERACTION_CREATE' directly into discord.py's gateway parsers.
+        discord.py looks up parsers by event name, so this handler is only called for interactions,
+        instead of being fanned out for every gateway event like 'on_socket_response'.
         """
+        state = super(ButtonHandler, self)._get_state(**options)
+        state.parsers['INTERACTION_CREATE'] = self.parse_interaction_create
+        return state
 
-        if msg['t'] != 'INTERACTION_CREATE':
-            # This event handler only handles 'INTERACTION_CREATE' event, so other events are dismissed.
+    def parse_interaction_create(self, data: JSON):
+        """
+        Gateway parser for 'INTERACTION_CREATE' event.
+        :param data: event data ('d' field) of gateway payload received in discord.py client's websocket.
+        """
+        try:
+            self._parse_interaction_create(data)
+        except Exception:
+            # Parsers run inside discord.py's websocket read loop, so errors must not propagate to it.
+            btn_logger.exception("ButtonHandler : Ignoring exception while parsing 'INTERACTION_CREATE' event.")
+
+    def _parse_interaction_create(self, data: JSON):
+        if btn_logger.isEnabledFor(logging.DEBUG):
+            btn_logger.debug("ButtonHandler : 'INTERACTION_CREATE' Event received in websocket. Event data :\n%s", utils.json_dumps(data, pretty=True).decode('utf-8'))
+
+        payload: InteractionPayload = InteractionPayload(data)
+        if instrumentation.tracer is not None:
+            instrumentation.tracer('interaction_create', {
+                'id': payload.id,
+                'type': payload.type,
+                'custom_id': payload.custom_id,
+                'guild_id': payload.guild_id,
+                'channel_id': payload.channel_id
+            })
+        if payload.custom_id is None:
+            # Not a component interaction.
             return
 
-        btn_logger.debug("ButtonHandler : 'INTERACTION_CREATE' Event received in websocket. Debugging gateway payload :\n{}".format(
-            json.dumps(msg, ensure_ascii=False, indent=2)
-        ))
-        data = msg['d']
-        btn_logger.debug('ButtonHandler : Event data from gateway payload : {}'.format(
-            json.dumps(data, ensure_ascii=False, indent=2)
-        ))
+        btn: Optional[Button] = ButtonCache().get_button(payload.custom_id)
+        btn_logger.debug('btn : %s', btn)
+        ctx: Optional[ButtonContext] = None
+        waiters: ClickWaiters = ClickWaiters()
+        waited: bool = waiters.has_waiters(payload.message_id, payload.custom_id)
+        if waited or (btn is not None and self.auto_defer is not None):
+            ctx = self._build_context(btn, payload)
+        if ctx is not None and self.auto_defer is not None:
+            # Timer starts on receipt, so time spent in dispatcher's queue, lanes and parking counts against it.
+            ctx.defer_handle = self.timer_wheel.schedule(self.auto_defer, ctx.auto_defer)
+        if waited and ctx is not None:
+            # Waiters are resolved here, so that they don't miss clicks on evicted or unregistered buttons,
+            # or clicks dropped and delayed by the dispatcher.
+            waiters.resolve(ctx)
 
-        custom_id = data['data']['custom_id']
-        btn: Optional[Button] = ButtonCache().get_button(custom_id)
-        btn_logger.debug(f'btn : {btn}')
+        dispatched: bool = False
         if btn is not None:
-            data = msg['d']
-            state = self._get_state()
-
-            channel_id: int = data['channel_id']
-            btn_logger.debug(f'channel.id : {channel_id}')
-
-            if 'guild_id' in data and 'member' in data:
-                # Interaction from guild
-                guild_id: int = data['guild_id']
-                btn_logger.debug('Interaction from guild : id = {}'.format(guild_id))
-                guild: Optional[Guild] = self.get_guild(guild_id)
-                btn_logger.debug('- Guild : {}'.format(guild))
-                if guild is not None:
-                    member: Member = Member(data=data['member'], guild=guild, state=state)
-                    btn_logger.debug('member : {}'.format(member))
-                    channel: Optional[Messageable] = guild.get_channel(channel_id)
-                    btn_logger.debug('guild.get_channel(channel.id) : {}'.format(channel))
-
-                msg: ComponentMessage = ComponentMessage(state=state, channel=channel, data=data['message'])
-                await btn.invoke(
-                    ButtonContext(msg, member, btn, data['id'], raw_data=data)
-                )
-
-            elif 'user' in data:
-                # Interaction from channel
-                user: User = User(data=data['user'], state=state)
-                btn_logger.debug('user : {}'.format(user))
-                channel: Optional[Messageable] = self.get_channel(channel_id)
-                btn_logger.debug('Client.get_channel(channel.id) : {}'.format(channel))
-
-                msg: ComponentMessage = ComponentMessage(state=state, channel=channel, data=data['message'])
-                await btn.invoke(
-                    ButtonContext(msg, user, btn, data['id'], raw_data=data)
-                )
-
-
-class ButtonClient(Client, ButtonHandler):
+            if self.dispatcher is not None:
+                dispatched = self.dispatcher.submit(btn, payload, ctx)
+            else:
+                self._schedule_event(self.handle_button_interaction, 'button_interaction', btn, payload, ctx)
+                dispatched = True
+        if not dispatched and ctx is not None and not ctx.waited and ctx.defer_handle is not None:
+            # Neither a callback nor a waiter answers this click, so it must not be deferred either.
+            ctx.defer_handle.cancel()
+
+    async def _run_button_interaction(self, btn: Button, payload: InteractionPayload, ctx: Optional[ButtonContext] = None):
+        await self._run_event(self.handle_button_interaction, 'button_interaction', btn, payload, ctx)
+
+    def broadcast(self, channels, content=None, **kwargs):
+        """
+        Send the same message to many channels. See :func:`discord_buttons.broadcast.broadcast`.
+        :return: async iterator of sent ComponentMessage, or BroadcastError of failed channels.
+        """
+        return broadcast(self, channels, content, **kwargs)
+
+    async def close(self):
+        if self.dispatcher is not None:
+            await self.dispatcher.close()
+        self.timer_wheel.close()
+        self.interactions.close()
+        ClickWaiters().cancel_all()
+        await self.interaction_http.close()
+        await super(ButtonHandler, self).close()
+
+    async def handle_button_interaction(self, btn: Button, payload: InteractionPayload, ctx: Optional[ButtonContext] = None):
+        """
+        Build ButtonContext from interaction data and invoke button's callback.
+        :param btn: Button object which matches interaction's custom_id.
+        :param payload: decoded event data ('d' field) of gateway payload.
+        :param ctx: ButtonContext already built for click waiters, if any.
+        """
+        if ctx is None:
+            ctx = self._build_context(btn, payload)
+        if ctx is not None:
+            await self._invoke_button(btn, ctx)
+
+    def _build_context(self, btn: Optional[Button], payload: InteractionPayload) -> Optional[ButtonContext]:
+        """
+        Build ButtonContext of a click, and index the interaction.
+        :param btn: Button object which matches interaction's custom_id. If None, the button is decoded from the message.
+        :param payload: decoded event data ('d' field) of gateway payload.
+        :return: ButtonContext, or None if the interaction has neither member nor user.
+        """
+        state = self._connection
+        data: JSON = payload.raw
+        channel_id: int = payload.channel_id
+        btn_logger.debug('channel.id : %s', channel_id)
+
+        if payload.guild_id is not None and payload.member is not None:
+            # Interaction from guild
+            btn_logger.debug('Interaction from guild : id = %s', payload.guild_id)
+            guild: Optional[Union[Guild, PartialGuild]] = None if self.stateless else self.get_guild(payload.guild_id)
+            if guild is None:
+                # Stateless mode or not cached : build guild from the payload.
+                guild = PartialGuild(state, payload.guild_id, int(payload.member.get('permissions') or 0))
+            btn_logger.debug('- Guild : %s', guild)
+            user: Union[Member, User] = Member(data=payload.member, guild=guild, state=state)
+            btn_logger.debug('member : %s', user)
+            channel: Optional[Messageable] = guild.get_channel(channel_id) or PartialChannel(state, channel_id, guild)
+            btn_logger.debug('guild.get_channel(channel.id) : %s', channel)
+
+        elif payload.user is not None:
+            # Interaction from channel
+            user: Union[Member, User] = User(data=payload.user, state=state)
+            btn_logger.debug('user : %s', user)
+            channel: Optional[Messageable] = (
+                None if self.stateless else self.get_channel(channel_id)
+            ) or PartialChannel(state, channel_id)
+            btn_logger.debug('Client.get_channel(channel.id) : %s', channel)
+
+        else:
+            return None
+
+        msg: LazyComponentMessage = LazyComponentMessage(state=state, channel=channel, data=payload.message)
+        if btn is None:
+            # Not registered (or evicted) button : use the one in the message.
+            btn = msg.get_button(payload.custom_id) or Button.view('', ButtonStyle.Gray, payload.custom_id)
+        self.interactions.add(InteractionRecord(
+            payload.id,
+            payload.token,
+            payload.application_id,
+            custom_id=payload.custom_id,
+            message_id=payload.message_id
+        ))
+        return ButtonContext(msg, user, btn, payload.id, raw_data=data, client=self, payload=payload)
+
+    async def _invoke_button(self, btn: Button, ctx: ButtonContext):
+        if self.auto_defer is None:
+            return await btn.invoke(ctx)
+
+        handle: Optional[TimerHandle] = ctx.defer_handle
+        if handle is None:
+            # Context built outside of the gateway parser.
+            handle = ctx.defer_handle = self.timer_wheel.schedule(self.auto_defer, ctx.auto_defer)
+        # Clicks handed to streams or waiters are answered later by their consumer, so their timer must keep running.
+        left: bool = btn.leaves_response(ctx)
+        try:
+            return await btn.invoke(ctx)
+        finally:
+            if not left:
+                handle.cancel()
+
+
+class ButtonClient(ButtonHandler, Client):
     """
     Represents client which can handle discord buttons feature.
 
@@ -95,7 +241,7 @@ class ButtonClient(Client, ButtonHandler):
     pass
 
 
-class AutoShardedButtonClient(AutoShardedClient, ButtonHandler):
+class AutoShardedButtonClient(ButtonHandler, AutoShardedClient):
     """
     This is similar to :class:`.ButtonClient` except that it is inherited from
     :class:`discord.AutoShardedClient` instead.
@@ -1,5 +1,7 @@
 from enum import Enum
+from typing import Optional, Iterable, Tuple, Dict
 
+from discord_buttons import utils
 from discord_buttons.type_hints import JSON
 
 
@@ -7,18 +9,99 @@ class ComponentType(Enum):
     Group = 1
     Button = 2
 
+    @classmethod
+    def parse(cls, value: int) -> 'ComponentType':
+        component_type: Optional[ComponentType] = _COMPONENT_TYPES.get(value)
+        if component_type is None:
+            raise ValueError('Invalid value is passed in ComponentType.parse(value) : {} is not a valid component type integer.'.format(value))
+        return component_type
+
+
+# Dict lookup instead of Enum's value scan, since component types are parsed for every decoded component.
+_COMPONENT_TYPES: Dict[int, ComponentType] = {member.value: member for member in ComponentType}
+
 
 class Component:
+    """
+    Parent class for all components.
+    Serialized form of the component is cached both as dict and as encoded json bytes,
+    and invalidated whenever a public field of the component is changed.
+    """
     type: ComponentType
+    __slots__ = ('type', '_json', '_json_bytes', '__weakref__')
 
     def __init__(self, type: ComponentType):
+        self._json: Optional[JSON] = None
+        self._json_bytes: Optional[bytes] = None
         self.type = type
 
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        if not key.startswith('_'):
+            # Public field is changed, so cached serialization is outdated.
+            object.__setattr__(self, '_json', None)
+            object.__setattr__(self, '_json_bytes', None)
+
     def __repr__(self) -> str:
         return 'discord.interactions.components.Component(type={})'.format(self.type.value)
 
-    def to_json(self) -> JSON:
+    def _build_json(self) -> JSON:
         data = {
             'type': self.type.value
         }
         return data
+
+    def to_json(self) -> JSON:
+        """
+        Return serialized component. Returned dict is cached and shared, so it must not be mutated.
+        """
+        if self._json is None:
+            self._json = self._build_json()
+        return self._json
+
+    def to_json_bytes(self) -> bytes:
+        """
+        Return serialized component encoded in json.
+        """
+        if self._json_bytes is None:
+            self._json_bytes = utils.json_dumps(self.to_json())
+        return self._json_bytes
+
+
+class ActionRow(Component):
+    """
+    Row of components (component type 1). Components of a row can't be changed after creation.
+    Row's serialized form is assembled from its components' cached forms, so changes on them are reflected.
+    """
+    components: Tuple[Component, ...]
+    __slots__ = ('components',)
+
+    def __init__(self, components: Iterable[Component]):
+        super(ActionRow, self).__init__(type=ComponentType.Group)
+        object.__setattr__(self, 'components', tuple(components))
+
+    def __setattr__(self, key, value):
+        if key == 'components':
+            raise AttributeError('ActionRow.components is immutable.')
+        super(ActionRow, self).__setattr__(key, value)
+
+    def __repr__(self) -> str:
+        return 'discord.interactions.components.ActionRow(components={})'.format(self.components)
+
+    def __iter__(self):
+        return iter(self.components)
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def to_json(self) -> JSON:
+        return {
+            'type': self.type.value,
+            'components': [component.to_json() for component in self.components]
+        }
+
+    def to_json_bytes(self) -> bytes:
+        return b'{"type":%d,"components":[%s]}' % (
+            self.type.value,
+            b','.join(component.to_json_bytes() for component in self.components)
+        )
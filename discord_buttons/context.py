@@ -1,9 +1,8 @@
 from typing import Optional, List, Union
 import discord
-from discord.http import Route
 
-from discord_buttons.interactions import InteractionContext
-from discord_buttons.message import ComponentMessage
+from discord_buttons.interactions import InteractionContext, InteractionPayload
+from discord_buttons.message import ComponentMessage, LazyComponentMessage
 from discord_buttons.type_hints import JSON
 
 __all__ = (
@@ -12,16 +11,40 @@ __all__ = (
 
 
 class ButtonContext(InteractionContext):
+    __slots__ = (
+        'message',
+        'channel',
+        'user',
+        'guild',
+        'button',
+        'raw_data',
+        'payload',
+        'waited',
+        'send',
+        'reply'
+    )
+
     def __init__(
             self,
-            message: ComponentMessage,
+            message: Union[ComponentMessage, LazyComponentMessage],
             user: Union[discord.User, discord.Member],
             button: 'Button',
-            interaction_id: str,
-            raw_data: JSON
+            interaction_id: int,
+            raw_data: JSON,
+            client: Optional[discord.Client] = None,
+            payload: Optional[InteractionPayload] = None
     ):
-        super(ButtonContext, self).__init__()
-        self.message: ComponentMessage = message
+        if payload is None:
+            payload = InteractionPayload(raw_data)
+        super(ButtonContext, self).__init__(
+            client=client,
+            interaction_id=payload.id,
+            interaction_token=payload.token,
+            application_id=payload.application_id
+        )
+        self.payload: InteractionPayload = payload
+        self.waited: bool = False   # Set when the click resolves a wait_for_click.
+        self.message: Union[ComponentMessage, LazyComponentMessage] = message
         self.channel: discord.abc.Messageable = message.channel
         self.user: Union[discord.User, discord.Member] = user
         if isinstance(self.user, discord.Member):
@@ -30,18 +53,6 @@ class ButtonContext(InteractionContext):
             self.guild = None
 
         self.button: 'Button' = button
-        self.interaction_id: str = interaction_id
         self.raw_data: JSON = raw_data
         self.send = message.channel.send
         self.reply = message.reply
-
-    async def respond(
-            self,
-            type: int,
-            content: str,
-            embed: Optional[discord.Embed] = None,
-            embeds: Optional[List[discord.Embed]] = None,
-            tts: Optional[bool] = None,
-            flags: Optional[int] = None
-    ):
-        Route('POST', '')
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import List, Dict, Callable, Optional, Union
+
+from discord_buttons.button import Button, ButtonStyle
+from discord_buttons.component import ComponentType
+from discord_buttons.type_hints import JSON
+
+__all__ = (
+    'ComponentDecoder',
+    'decoder'
+)
+
+
+class ComponentDecoder:
+    """
+    Table driven decoder of message components.
+    Decoding functions are looked up by raw component type integer from a table built once, and action rows are
+    decoded into lists of non-registered Button views in a single pass, while validating discord's limits.
+    """
+    __slots__ = ('validate', '_table')
+
+    MAX_ROWS: int = 5
+    MAX_ROW_COMPONENTS: int = 5
+    MAX_LABEL_LENGTH: int = 80
+    MAX_CUSTOM_ID_LENGTH: int = 100
+
+    def __init__(self, validate: bool = True):
+        """
+        :param validate: If True, components exceeding discord's limits raise ValueError.
+        """
+        self.validate: bool = validate
+        self._table: Dict[int, Callable[[JSON], Union[Button, List[Button]]]] = {
+            ComponentType.Group.value: self.decode_row,
+            ComponentType.Button.value: self.decode_button
+        }
+
+    def decode(self, components: List[JSON]) -> List[Union[List[Button], Button]]:
+        """
+        Decode top level components of a message.
+        :param components: 'components' field of message payload.
+        :return: list of rows (list of buttons). Unknown component types are skipped.
+        """
+        if self.validate and len(components) > self.MAX_ROWS:
+            raise ValueError('Message can have up to {} action rows, but {} are given.'.format(self.MAX_ROWS, len(components)))
+        table = self._table
+        decoded: List[Union[List[Button], Button]] = []
+        for component in components:
+            decode = table.get(component['type'])
+            if decode is not None:
+                decoded.append(decode(component))
+        return decoded
+
+    def decode_row(self, data: JSON) -> List[Button]:
+        children: List[JSON] = data.get('components') or []
+        if self.validate and len(children) > self.MAX_ROW_COMPONENTS:
+            raise ValueError('Action row can have up to {} components, but {} are given.'.format(self.MAX_ROW_COMPONENTS, len(children)))
+        button_type: int = ComponentType.Button.value
+        decode_button = self.decode_button
+        return [decode_button(child) for child in children if child['type'] == button_type]
+
+    def decode_button(self, data: JSON) -> Button:
+        label: str = data.get('label', '')
+        custom_id: Optional[str] = data.get('custom_id')
+        if self.validate:
+            if len(label) > self.MAX_LABEL_LENGTH:
+                raise ValueError('Button label can be up to {} characters, but {} are given.'.format(self.MAX_LABEL_LENGTH, len(label)))
+            if custom_id is not None and len(custom_id) > self.MAX_CUSTOM_ID_LENGTH:
+                raise ValueError('Button custom_id can be up to {} characters, but {} are given.'.format(self.MAX_CUSTOM_ID_LENGTH, len(custom_id)))
+        style: ButtonStyle = ButtonStyle.parse(data['style'])    # Raises ValueError on unknown style.
+        return Button.view(label, style, custom_id, data.get('url'), data.get('disabled', False))
+
+    def flatten(self, components: List[JSON]) -> List[Button]:
+        """Decode components into a flat list of buttons."""
+        buttons: List[Button] = []
+        for component in self.decode(components):
+            if isinstance(component, list):
+                buttons.extend(component)
+            else:
+                buttons.append(component)
+        return buttons
+
+
+decoder: ComponentDecoder = ComponentDecoder()
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from logging import getLogger
+from time import perf_counter
+from collections import deque
+from typing import Optional, List, Tuple, Any, Callable, Deque, Dict, Hashable, Union
+
+from discord_buttons.button import Button
+from discord_buttons.type_hints import JSON, CoroutineFunction
+
+__all__ = (
+    'ButtonDispatcher',
+)
+
+btn_logger = getLogger('discord_buttons')
+
+KeyFunction = Callable[..., Hashable]
+Item = Tuple[Button, Tuple[Any, ...], float, Optional[Hashable]]    # (button, args, queued_at, lane key)
+
+
+def _message_key(button: Button, payload, *args) -> Optional[int]:
+    return payload.message_id
+
+
+def _user_key(button: Button, payload, *args) -> Optional[int]:
+    return payload.user_id
+
+
+def _custom_id_key(button: Button, payload, *args) -> Optional[str]:
+    return payload.custom_id
+
+
+# Built-in keys of ButtonDispatcher's serialize_by option. Called with (button, InteractionPayload).
+SERIAL_KEYS: Dict[str, KeyFunction] = {
+    'message': _message_key,
+    'user': _user_key,
+    'custom_id': _custom_id_key
+}
+
+
+class ButtonDispatcher:
+    """
+    Run button callbacks on a bounded pool of worker tasks.
+    Clicks are queued up to ``queue_size``. When the queue is full, click is either dropped (overflow='drop'),
+    or kept aside until the queue has room (overflow='defer'). At most ``queue_size`` clicks are kept aside,
+    and later clicks are dropped.
+    Buttons created with ``max_concurrency`` never run more callbacks than that at once. Clicks over the limit are
+    parked without holding a worker, and resumed by the worker which finishes one of the button's callbacks.
+    With ``serialize_by``, clicks sharing a key (message id, user id, custom_id or custom key) run one at a time in
+    arrival order, while clicks with different keys still run in parallel. Each busy key has a lane of pending clicks,
+    created on its first click and removed as soon as it is drained.
+    """
+    __slots__ = (
+        'runner',
+        'workers',
+        'overflow',
+        '_queue',
+        '_tasks',
+        '_overflow',
+        '_running',
+        '_parked',
+        'key',
+        '_lanes',
+        '_lane_depth',
+        'processed',
+        'dropped',
+        'deferred',
+        'in_flight',
+        'total_wait',
+        'max_wait',
+        'total_run',
+        'max_run'
+    )
+
+    OVERFLOW_POLICIES = ('drop', 'defer')
+
+    def __init__(
+            self,
+            runner: CoroutineFunction,
+            workers: int = 16,
+            queue_size: int = 1000,
+            overflow: str = 'drop',
+            serialize_by: Optional[Union[str, KeyFunction]] = None
+    ):
+        """
+        :param runner: coroutine function called with (button, *args) for each click.
+        :param workers: number of worker tasks.
+        :param queue_size: maximum number of clicks waiting for a worker. Also bounds clicks waiting in lanes.
+        :param overflow: 'drop' or 'defer'. Policy applied when the queue (or lanes) is full.
+        :param serialize_by: 'message', 'user', 'custom_id', or a function called with (button, *args) returning
+                             a hashable key. Clicks with the same key run in order, one at a time.
+                             None (default) runs every click concurrently.
+        """
+        if workers <= 0:
+            raise ValueError('ButtonDispatcher.workers must be a positive integer.')
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError('ButtonDispatcher.overflow must be one of {}.'.format(self.OVERFLOW_POLICIES))
+        self.runner: CoroutineFunction = runner
+        self.workers: int = workers
+        self.overflow: str = overflow
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._overflow: Deque[Item] = deque()
+        self._running: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # Button -> number of running callbacks
+        self._parked: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()   # Button -> clicks over max_concurrency
+        if isinstance(serialize_by, str):
+            if serialize_by not in SERIAL_KEYS:
+                raise ValueError('ButtonDispatcher.serialize_by must be one of {} or a function.'.format(tuple(SERIAL_KEYS)))
+            serialize_by = SERIAL_KEYS[serialize_by]
+        self.key: Optional[KeyFunction] = serialize_by
+        self._lanes: Dict[Hashable, Deque[Item]] = {}
+        self._lane_depth: int = 0
+
+        # Metrics
+        self.processed: int = 0
+        self.dropped: int = 0
+        self.deferred: int = 0
+        self.in_flight: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+        self.total_run: float = 0.0
+        self.max_run: float = 0.0
+
+    def submit(self, button: Button, *args: Any) -> bool:
+        """
+        Queue a click. Must be called inside the running event loop.
+        :return: False if the click is dropped.
+        """
+        if len(self._tasks) < self.workers:
+            self._start()
+
+        key: Optional[Hashable] = None
+        if self.key is not None:
+            try:
+                key = self.key(button, *args)
+            except Exception:
+                # submit runs inside the gateway parser, so errors of key function must not propagate.
+                btn_logger.exception('ButtonDispatcher : Ignoring exception in serialize_by, click on %s runs unordered.', button.custom_id)
+        item: Item = (button, args, perf_counter(), key)
+        if key is not None:
+            lane: Optional[Deque[Item]] = self._lanes.get(key)
+            if lane is not None:
+                # Key is busy : run after earlier clicks with the same key, on the worker which owns the lane.
+                maxsize: int = self._queue.maxsize
+                if 0 < maxsize <= self._lane_depth:
+                    if self.overflow == 'drop' or self._lane_depth >= 2 * maxsize:
+                        self.dropped += 1
+                        btn_logger.debug('ButtonDispatcher : lanes are full, click on %s is dropped.', button.custom_id)
+                        return False
+                    self.deferred += 1
+                lane.append(item)
+                self._lane_depth += 1
+                return True
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            if self.overflow == 'drop' or len(self._overflow) >= self._queue.maxsize:
+                self.dropped += 1
+                btn_logger.debug('ButtonDispatcher : queue is full, click on %s is dropped.', button.custom_id)
+                return False
+            # Moved into the queue by workers as they take clicks from it.
+            self.deferred += 1
+            self._overflow.append(item)
+        if key is not None:
+            self._lanes[key] = deque()
+        return True
+
+    def stats(self) -> JSON:
+        """Return queue and latency metrics. Latencies are in seconds."""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'in_flight': self.in_flight,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'deferred': self.deferred,
+            'overflow_depth': len(self._overflow),
+            'parked': sum(map(len, self._parked.values())),
+            'lanes': len(self._lanes),
+            'lane_depth': self._lane_depth,
+            'avg_wait': self.total_wait / self.processed if self.processed else 0.0,
+            'max_wait': self.max_wait,
+            'avg_run': self.total_run / self.processed if self.processed else 0.0,
+            'max_run': self.max_run
+        }
+
+    async def close(self) -> None:
+        """Cancel worker tasks. Queued clicks are discarded."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._lanes.clear()
+        self._lane_depth = 0
+        self._overflow.clear()
+        self._parked.clear()
+
+    def _start(self) -> None:
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.ensure_future(self._work()))
+
+    def _at_limit(self, button: Button) -> bool:
+        return button.max_concurrency is not None and self._running.get(button, 0) >= button.max_concurrency
+
+    async def _work(self) -> None:
+        while True:
+            item: Item = await self._queue.get()
+            if self._overflow:
+                # Taking a click made room in the queue.
+                self._queue.put_nowait(self._overflow.popleft())
+            try:
+                # Clicks which this worker continues with : next click of the lane, or a parked click of the button.
+                pending: Deque[Item] = deque((item,))
+                while pending:
+                    item = pending.popleft()
+                    button: Button = item[0]
+                    if self._at_limit(button):
+                        # Park the click instead of waiting, so the worker can serve other buttons.
+                        self._parked.setdefault(button, deque()).append(item)
+                        continue
+
+                    await self._run(item)
+                    key: Optional[Hashable] = item[3]
+                    if key is not None:
+                        # Drain the lane of this key, so that its clicks run in order.
+                        lane: Deque[Item] = self._lanes[key]
+                        if lane:
+                            self._lane_depth -= 1
+                            pending.append(lane.popleft())
+                        else:
+                            del self._lanes[key]    # Idle lanes are removed, so keys never accumulate.
+                    parked: Optional[Deque[Item]] = self._parked.get(button)
+                    if parked:
+                        pending.append(parked.popleft())
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, item: Item) -> None:
+        button, args, queued_at, _ = item
+        running = self._running
+        running[button] = running.get(button, 0) + 1
+        started_at = perf_counter()
+        self.in_flight += 1
+        try:
+            await self.runner(button, *args)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            btn_logger.exception('ButtonDispatcher : Ignoring exception in button callback.')
+        finally:
+            self.in_flight -= 1
+            running[button] -= 1
+
+        finished_at = perf_counter()
+        wait, run = started_at - queued_at, finished_at - started_at
+        self.processed += 1
+        self.total_wait += wait
+        self.total_run += run
+        self.max_wait = max(self.max_wait, wait)
+        self.max_run = max(self.max_run, run)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from typing import Optional, Any
+
+import aiohttp
+from discord import HTTPException, Forbidden, NotFound, DiscordServerError
+from discord.http import Route
+
+from discord_buttons import utils
+from discord_buttons.type_hints import JSON
+
+__all__ = (
+    'InteractionHTTPClient',
+    'default_interaction_http'
+)
+
+btn_logger = getLogger('discord_buttons')
+
+
+async def _json_or_text(response: aiohttp.ClientResponse) -> Any:
+    """Decode response body with the selected json backend (see utils.use_json_backend), or as text."""
+    body: bytes = await response.read()
+    if response.headers.get('Content-Type', '').startswith('application/json'):
+        return utils.json_loads(body)
+    return body.decode('utf-8')
+
+
+class InteractionHTTPClient:
+    """
+    Dedicated HTTP lane for interaction callbacks and follow-up webhook messages.
+    Interaction endpoints are authorized by the interaction token and rate limited separately from bot routes,
+    so requests skip discord.py's per-route locks and global rate limit, and run concurrently over a pooled
+    keep-alive connection pool.
+    """
+    __slots__ = ('user_agent', 'proxy', 'proxy_auth', 'limit', 'keepalive_timeout', '_session')
+
+    def __init__(
+            self,
+            user_agent: Optional[str] = None,
+            proxy: Optional[str] = None,
+            proxy_auth: Optional[aiohttp.BasicAuth] = None,
+            limit: int = 100,
+            keepalive_timeout: float = 60.0
+    ):
+        """
+        :param user_agent: User-Agent header. Usually same as discord.py HTTPClient's.
+        :param limit: maximum number of simultaneous connections in the pool.
+        :param keepalive_timeout: seconds to keep idle connections open for reuse.
+        """
+        self.user_agent: Optional[str] = user_agent
+        self.proxy: Optional[str] = proxy
+        self.proxy_auth: Optional[aiohttp.BasicAuth] = proxy_auth
+        self.limit: int = limit
+        self.keepalive_timeout: float = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Any:
+        """
+        Send request to an interaction endpoint.
+        :param method: HTTP method.
+        :param path: endpoint path after API base url.
+        :param body: json encoded request body.
+        :return: decoded response.
+        """
+        headers: JSON = {}
+        if self.user_agent is not None:
+            headers['User-Agent'] = self.user_agent
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        url: str = Route.BASE + path
+
+        for tries in range(5):
+            try:
+                async with self.session.request(
+                        method, url, data=body, headers=headers, proxy=self.proxy, proxy_auth=self.proxy_auth
+                ) as r:
+                    data = await _json_or_text(r)
+                    if 300 > r.status >= 200:
+                        return data
+
+                    if r.status == 429 and r.headers.get('Via'):
+                        retry_after: float = data['retry_after']
+                        btn_logger.warning('InteractionHTTPClient : rate limited on %s %s. Retrying in %.2f seconds.', method, path, retry_after)
+                        await asyncio.sleep(retry_after)
+                        continue
+
+                    if r.status in {500, 502}:
+                        await asyncio.sleep(1 + tries * 2)
+                        continue
+
+                    if r.status == 403:
+                        raise Forbidden(r, data)
+                    elif r.status == 404:
+                        raise NotFound(r, data)
+                    elif r.status == 503:
+                        raise DiscordServerError(r, data)
+                    else:
+                        raise HTTPException(r, data)
+            except OSError as e:
+                # Connection reset by peer
+                if tries < 4 and e.errno in (54, 10054):
+                    continue
+                raise
+
+        if r.status >= 500:
+            raise DiscordServerError(r, data)
+        raise HTTPException(r, data)
+
+    def create_response(self, interaction_id: int, token: str, body: bytes):
+        return self.request('POST', '/interactions/{}/{}/callback'.format(interaction_id, token), body)
+
+    def edit_original_response(self, application_id: int, token: str, body: bytes):
+        return self.request('PATCH', '/webhooks/{}/{}/messages/@original'.format(application_id, token), body)
+
+    def delete_original_response(self, application_id: int, token: str):
+        return self.request('DELETE', '/webhooks/{}/{}/messages/@original'.format(application_id, token))
+
+    def create_followup(self, application_id: int, token: str, body: bytes):
+        return self.request('POST', '/webhooks/{}/{}?wait=true'.format(application_id, token), body)
+
+
+_default: Optional[InteractionHTTPClient] = None
+
+
+def default_interaction_http() -> InteractionHTTPClient:
+    """Return shared InteractionHTTPClient, for clients which don't provide their own."""
+    global _default
+    if _default is None:
+        _default = InteractionHTTPClient()
+    return _default
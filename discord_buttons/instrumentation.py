@@ -0,0 +1,57 @@
+"""
+Logging and tracing of discord_buttons.
+
+Log records of 'discord_buttons' logger are formatted lazily, and the logger defaults to WARNING level.
+Tracing is disabled by default. When a tracer is set, it's called with an event name and a dict of structured fields
+for each traced request. Call sites check ``instrumentation.tracer is not None`` before building the fields,
+so disabled tracing costs a single attribute lookup.
+"""
+import logging
+from sys import stdout
+from typing import Optional, Callable, TextIO, Union
+
+from discord_buttons.type_hints import JSON
+
+__all__ = (
+    'Tracer',
+    'tracer',
+    'set_tracer',
+    'setup_logging'
+)
+
+Tracer = Callable[[str, JSON], None]
+
+btn_logger = logging.getLogger('discord_buttons')
+btn_logger.setLevel(logging.WARNING)
+btn_logger.addHandler(logging.NullHandler())
+
+tracer: Optional[Tracer] = None
+
+
+def set_tracer(new_tracer: Optional[Tracer]) -> None:
+    """
+    Set tracer called for each traced request, or disable tracing with None.
+    Traced events : 'interaction_create', 'send_message', 'send_files'.
+    :param new_tracer: callable receiving (event name, fields).
+    """
+    global tracer
+    tracer = new_tracer
+
+
+def setup_logging(level: Union[int, str] = logging.WARNING, stream: Optional[TextIO] = stdout) -> logging.Logger:
+    """
+    Set level of 'discord_buttons' logger, and optionally attach a console handler.
+    :param level: logging level.
+    :param stream: stream to attach console handler to. If None, no handler is attached.
+    """
+    btn_logger.setLevel(level)
+    if stream is not None:
+        console_handler = logging.StreamHandler(stream)
+        console_handler.setFormatter(
+            logging.Formatter(
+                style='{',
+                fmt='[{asctime}] [{levelname}] {name}: {message}'
+            )
+        )
+        btn_logger.addHandler(console_handler)
+    return btn_logger
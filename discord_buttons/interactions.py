@@ -2,23 +2,125 @@ from __future__ import annotations
 
 import asyncio
 from enum import Enum
-from typing import Optional, Callable, Any, List
+from functools import partial
+from typing import Optional, Callable, Any, List, Dict, Union
 
 from discord import Member, User, Guild, Client, Embed, AllowedMentions
 from discord.abc import Messageable
-from discord.http import Route
 
+from discord_buttons import utils
+from discord_buttons.http import InteractionHTTPClient, default_interaction_http
 from discord_buttons.button import ComponentType, Button, ButtonCache
+from discord_buttons.timer import TimerWheel, TimerHandle
 from discord_buttons.type_hints import JSON, Function, CoroutineFunction
 
 
 class InteractionType:
     Ping = 1
     ApplicationCommand = 2
+    MessageComponent = 3
+
+
+class InteractionResponseType(Enum):
+    Pong = 1  # ACK a ping
+    Acknowledge = 2  # @Deprecated ACK a command without sending a message, eating the user's input
+    ChannelMessage = 3  # @Deprecated respond with a message, eating the user's input
+    ChannelMessageWithSource = 4  # respond to an interaction with a message
+    DeferredChannelMessageWithSource = 5  # ACK an interaction and edit a response later, the user sees a loading state
+    DeferredUpdateMessage = 6  # ACK a component interaction and edit the original message later, the user doesn't see a loading state
+    UpdateMessage = 7  # edit the message the component was attached to
+
+    @classmethod
+    def from_value(cls, value: int) -> Optional[InteractionResponseType]:
+        return _INTERACTION_RESPONSE_TYPES.get(value)
+
+
+_INTERACTION_RESPONSE_TYPES: Dict[int, InteractionResponseType] = {member.value: member for member in InteractionResponseType}
+
+
+def _snowflake(data: JSON, key: str) -> Optional[int]:
+    value = data.get(key)
+    return int(value) if value is not None else None
+
+
+class InteractionPayload:
+    """
+    Typed record of a raw 'INTERACTION_CREATE' event data, decoded once when the event is received.
+    Snowflakes are converted to int and component type is parsed. Nested objects (member, user, message) are kept raw,
+    and decoded by consumers only when they need them.
+    """
+    __slots__ = (
+        'raw',
+        'id',
+        'application_id',
+        'type',
+        'token',
+        'version',
+        'guild_id',
+        'channel_id',
+        'custom_id',
+        'component_type',
+        'message_id'
+    )
+
+    def __init__(self, data: JSON):
+        self.raw: JSON = data
+        self.id: int = int(data['id'])
+        self.application_id: int = int(data['application_id'])
+        self.type: int = data['type']
+        self.token: str = data['token']
+        self.version: int = data.get('version', 1)
+        self.guild_id: Optional[int] = _snowflake(data, 'guild_id')
+        self.channel_id: Optional[int] = _snowflake(data, 'channel_id')
+
+        interaction_data: JSON = data.get('data') or {}
+        self.custom_id: Optional[str] = interaction_data.get('custom_id')
+        component_type: Optional[int] = interaction_data.get('component_type')
+        self.component_type: Optional[ComponentType] = None
+        if component_type is not None:
+            try:
+                self.component_type = ComponentType.parse(component_type)
+            except ValueError:
+                pass    # Component type not supported by this library (e.g. select menus).
+
+        message: Optional[JSON] = data.get('message')
+        self.message_id: Optional[int] = _snowflake(message, 'id') if message is not None else None
+
+    def __repr__(self) -> str:
+        return '<InteractionPayload id={} type={} custom_id={} guild_id={} channel_id={}>'.format(
+            self.id, self.type, self.custom_id, self.guild_id, self.channel_id
+        )
+
+    @property
+    def data(self) -> Optional[JSON]:
+        return self.raw.get('data')
+
+    @property
+    def member(self) -> Optional[JSON]:
+        """Raw member object. Present on interactions from guilds."""
+        return self.raw.get('member')
+
+    @property
+    def user(self) -> Optional[JSON]:
+        """Raw user object. Present on interactions from DMs. On guilds, use member['user']."""
+        return self.raw.get('user')
+
+    @property
+    def message(self) -> Optional[JSON]:
+        """Raw message object the component is attached to."""
+        return self.raw.get('message')
+
+    @property
+    def user_id(self) -> Optional[int]:
+        """Id of the user who invoked the interaction, either from member or user object."""
+        member: Optional[JSON] = self.member
+        user: Optional[JSON] = member.get('user') if member is not None else self.user
+        return _snowflake(user, 'id') if user is not None else None
 
 
 class InteractionData:
     """Parent calss for all interaction datas"""
+    __slots__ = ()
 
     @classmethod
     def is_valid(cls, data: JSON) -> bool:
@@ -46,6 +148,8 @@ class InteractionData:
 
 
 class ApplicationCommandInteractionData(InteractionData):
+    __slots__ = ('id', 'name', 'resolved', 'options')
+
     @classmethod
     def is_valid(cls, data: JSON) -> bool:
         """
@@ -91,6 +195,8 @@ class ApplicationCommandInteractionData(InteractionData):
 
 
 class ButtonInteractionData(InteractionData):
+    __slots__ = ('custom_id', 'component_type', '_button')
+
     @classmethod
     def is_valid(cls, data) -> bool:
         """
@@ -121,22 +227,71 @@ class ButtonInteractionData(InteractionData):
 
 
 class InteractionContext:
-    def __init__(self, client: Client):
+    __slots__ = (
+        'client',
+        'interaction_id',
+        'interaction_token',
+        'application_id',
+        'responded',
+        'deferred',
+        'defer_handle',
+        '_defer_task'
+    )
+
+    def __init__(
+            self,
+            client: Optional[Client] = None,
+            interaction_id: Optional[int] = None,
+            interaction_token: Optional[str] = None,
+            application_id: Optional[int] = None
+    ):
         self.client = client
+        self.interaction_id: Optional[int] = interaction_id
+        self.interaction_token: Optional[str] = interaction_token
+        self.application_id: Optional[int] = application_id
+        self.responded: bool = False
+        self.deferred: bool = False
+        self.defer_handle: Optional[TimerHandle] = None    # Auto defer timer, scheduled by ButtonHandler.
+        self._defer_task: Optional[asyncio.Task] = None
 
     def from_json(self, data): pass
 
-    async def respond(
+    def auto_defer(self) -> None:
+        """
+        Send deferred response in background if the interaction is not responded yet.
+        Scheduled by ButtonHandler when 'auto_defer' option is set, so that slow callbacks meet discord's 3 seconds
+        deadline of interaction response.
+        """
+        if not self.responded and self._defer_task is None:
+            self._defer_task = asyncio.ensure_future(self.defer())
+
+    @property
+    def http(self) -> InteractionHTTPClient:
+        """HTTP lane used to answer the interaction. Shared by the client if it provides one."""
+        return getattr(self.client, 'interaction_http', None) or default_interaction_http()
+
+    async def defer(self, response_type: InteractionResponseType = InteractionResponseType.DeferredChannelMessageWithSource):
+        """
+        ACK the interaction, and respond later. Later call of :meth:`respond` edits the original response.
+        """
+        if self.responded:
+            return
+        self.responded = True
+        await self.http.create_response(
+            self.interaction_id, self.interaction_token, utils.json_dumps({"type": response_type.value})
+        )
+        self.deferred = True
+
+    def _build_message_data(
             self,
-            response_type: InteractionResponseType,
             content: Optional[str] = None,
             embed: Optional[Embed] = None,
             embeds: Optional[List[Embed]] = None,
             allowed_mentions: Optional[AllowedMentions] = None,
             tts: Optional[bool] = None,
             flags: Optional[int] = None
-    ):
-        state = self.client._get_state()
+    ) -> JSON:
+        state = self.client._connection
         data: JSON = {}
 
         if content:
@@ -148,7 +303,7 @@ class InteractionContext:
             embeds = [embed]
 
         if embeds and len(embeds) <= 10:
-            data['embeds'] = list(map(embed.to_dict() for embed in embeds))
+            data['embeds'] = [embed.to_dict() for embed in embeds]
 
         if allowed_mentions:
             if state.allowed_mentions:
@@ -161,55 +316,261 @@ class InteractionContext:
         if tts:
             data['tts'] = tts
 
-        await self.client.http.request(
-            Route("POST", f"/interactions/{self.interaction_id}/{self.interaction_token}/callback"),
-            json={"type": response_type.value, "data": data},
-        )
+        if flags:
+            data['flags'] = flags
+        return data
+
+    async def respond(
+            self,
+            response_type: Optional[InteractionResponseType] = None,
+            content: Optional[str] = None,
+            embed: Optional[Embed] = None,
+            embeds: Optional[List[Embed]] = None,
+            allowed_mentions: Optional[AllowedMentions] = None,
+            tts: Optional[bool] = None,
+            flags: Optional[int] = None
+    ):
+        """
+        Respond to the interaction. Later calls edit the deferred response, or send follow-up messages.
+        :param response_type: type of the response. If None, ChannelMessageWithSource when a message (content, embed(s)
+                              or flags) is given, otherwise DeferredUpdateMessage which only acknowledges the click.
+        """
+        if self._defer_task is not None:
+            # Wait for auto deferred response, then edit it.
+            await self._defer_task
+
+        has_message: bool = bool(content or embed or embeds or flags)
+        if response_type is None:
+            response_type = (
+                InteractionResponseType.ChannelMessageWithSource if has_message
+                else InteractionResponseType.DeferredUpdateMessage
+            )
+        elif has_message and response_type in (InteractionResponseType.Pong, InteractionResponseType.DeferredUpdateMessage):
+            raise ValueError('{} response does not carry a message, but content, embeds or flags are given.'.format(response_type))
+
+        data: JSON = self._build_message_data(content, embed, embeds, allowed_mentions, tts, flags)
+
+        if self.deferred:
+            await self.edit_original_response(data)
+            return
+        if self.responded:
+            # Discord accepts only one callback per interaction. Later messages are sent as follow-ups.
+            if 'content' in data or 'embeds' in data:
+                await self.http.create_followup(self.application_id, self.interaction_token, utils.json_dumps(data))
+            return
+
+        self.responded = True
+        payload: JSON = {"type": response_type.value}
+        if response_type not in (InteractionResponseType.Pong, InteractionResponseType.DeferredUpdateMessage):
+            payload["data"] = data
+        await self.http.create_response(self.interaction_id, self.interaction_token, utils.json_dumps(payload))
+
+    async def edit_original_response(self, data: JSON):
+        """
+        Edit the original response of the interaction.
+        :param data: message edit payload (content, embeds, allowed_mentions, ...).
+        """
+        await self.http.edit_original_response(self.application_id, self.interaction_token, utils.json_dumps(data))
+
+    async def send_followup(
+            self,
+            content: Optional[str] = None,
+            embed: Optional[Embed] = None,
+            embeds: Optional[List[Embed]] = None,
+            allowed_mentions: Optional[AllowedMentions] = None,
+            tts: Optional[bool] = None,
+            flags: Optional[int] = None
+    ) -> JSON:
+        """
+        Send follow-up message of the interaction through its webhook.
+        :return: created message payload.
+        """
+        data: JSON = self._build_message_data(content, embed, embeds, allowed_mentions, tts, flags)
+        return await self.http.create_followup(self.application_id, self.interaction_token, utils.json_dumps(data))
+
+
+class InteractionRecord:
+    """Minimal data to respond to an interaction after its callback is finished."""
+    __slots__ = ('id', 'token', 'application_id', 'custom_id', 'message_id', 'handle', '__weakref__')
+
+    def __init__(
+            self,
+            id: int,
+            token: str,
+            application_id: int,
+            custom_id: Optional[str] = None,
+            message_id: Optional[int] = None
+    ):
+        self.id: int = id
+        self.token: str = token
+        self.application_id: int = application_id
+        self.custom_id: Optional[str] = custom_id
+        self.message_id: Optional[int] = message_id
+        self.handle: Optional[TimerHandle] = None
+
+    def __repr__(self) -> str:
+        return '<InteractionRecord id={} custom_id={} message_id={}>'.format(self.id, self.custom_id, self.message_id)
+
+
+class InteractionIndex:
+    """
+    Index of live interactions, keyed by interaction id and by token.
+    Records expire with the interaction token (15 minutes), on a dedicated timer wheel.
+    """
+    __slots__ = ('http', 'lifetime', '_by_id', '_by_token', '_wheel')
+
+    TOKEN_LIFETIME: float = 15 * 60
+
+    def __init__(self, http: Optional[InteractionHTTPClient] = None, lifetime: float = TOKEN_LIFETIME):
+        self.http: Optional[InteractionHTTPClient] = http
+        self.lifetime: float = lifetime
+        self._by_id: Dict[int, InteractionRecord] = {}
+        self._by_token: Dict[str, InteractionRecord] = {}
+        # Expiry is coarse, so one second resolution is enough. 1024 slots cover the lifetime in one round.
+        self._wheel: TimerWheel = TimerWheel(resolution=1.0, size=1024)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, interaction_id: int) -> bool:
+        return interaction_id in self._by_id
+
+    def add(self, record: InteractionRecord) -> InteractionRecord:
+        """Index interaction record. Must be called inside the running event loop."""
+        old: Optional[InteractionRecord] = self._by_id.get(record.id)
+        if old is not None:
+            self.remove(old.id)
+        self._by_id[record.id] = record
+        self._by_token[record.token] = record
+        record.handle = self._wheel.schedule(self.lifetime, self.remove, record.id)
+        return record
+
+    def get(self, interaction_id: int) -> Optional[InteractionRecord]:
+        return self._by_id.get(interaction_id)
+
+    def get_by_token(self, token: str) -> Optional[InteractionRecord]:
+        return self._by_token.get(token)
+
+    def remove(self, interaction_id: int) -> Optional[InteractionRecord]:
+        record: Optional[InteractionRecord] = self._by_id.pop(interaction_id, None)
+        if record is not None:
+            self._by_token.pop(record.token, None)
+            if record.handle is not None:
+                record.handle.cancel()
+        return record
+
+    def close(self) -> None:
+        self._wheel.close()
+        self._by_id.clear()
+        self._by_token.clear()
+
+    def _get_http(self) -> InteractionHTTPClient:
+        return self.http or default_interaction_http()
+
+    def _require(self, interaction_id: int) -> InteractionRecord:
+        record: Optional[InteractionRecord] = self._by_id.get(interaction_id)
+        if record is None:
+            raise KeyError('Interaction {} is not indexed or its token is expired.'.format(interaction_id))
+        return record
+
+    async def edit_original_response(self, interaction_id: int, data: JSON):
+        """
+        Edit the original response of an indexed interaction.
+        :param interaction_id: id of the interaction.
+        :param data: message edit payload (content, embeds, allowed_mentions, ...).
+        """
+        record: InteractionRecord = self._require(interaction_id)
+        return await self._get_http().edit_original_response(record.application_id, record.token, utils.json_dumps(data))
+
+    async def send_followup(self, interaction_id: int, data: JSON) -> JSON:
+        """
+        Send follow-up message of an indexed interaction.
+        :param interaction_id: id of the interaction.
+        :param data: message payload (content, embeds, allowed_mentions, ...).
+        """
+        record: InteractionRecord = self._require(interaction_id)
+        return await self._get_http().create_followup(record.application_id, record.token, utils.json_dumps(data))
 
 
 class Interaction:
     """
     Interaction object. Waiting for discord.py's interaction features to be released :D
     """
+    __slots__ = (
+        'id',
+        'application_id',
+        'type',
+        'token',
+        'version',
+        'client',
+        'guild_id',
+        '_guild',
+        'channel_id',
+        '_channel',
+        'member',
+        'user',
+        'data'
+    )
 
     @classmethod
-    async def from_data(cls, data: JSON, dpy_client: Client):
-        if 'guild_id' in data:
-            guild_id: int = data['guild_id']
-            guild: Optional[Guild] = dpy_client.get_guild(guild_id) or (await dpy_client.fetch_guild(guild_id))
-        else:
-            guild = None
-
-        if 'channel_id' in data:
-            channel_id: int = data['channel_id']
-            channel: Optional[Messageable] = dpy_client.get_channel(channel_id) or (
-                await dpy_client.fetch_channel(channel_id))
-        else:
-            channel = None
-
-        if 'user' in data:
-            user: Optional[User] = dpy_client.get_user(data['user']['id'])
-            member = None
-        elif 'member' in data:
-            member_id: int = data['member']['user']['id']
-            if guild is None:
-                raise ValueError('Interaction.guild is not found! Cancel parsing member object.')
-            member: Optional[Member] = guild.get_member(member_id) or (await guild.fetch_member(member_id))
-            user = member._user
+    async def from_data(cls, data: Union[JSON, InteractionPayload], dpy_client: Client, fetch: bool = True):
+        """
+        Build Interaction object from interaction payload.
+        Guild and channel are resolved from client's cache, and member/user are built from the payload itself.
+        :param data: raw interaction payload, or its decoded InteractionPayload.
+        :param dpy_client: discord.py client which received the interaction.
+        :param fetch: If True, guild and channel missing in cache are fetched concurrently.
+                      Concurrent fetches of same object are coalesced into one request.
+                      If False, missing objects are left as None and no request is made.
+        """
+        payload: InteractionPayload = data if isinstance(data, InteractionPayload) else InteractionPayload(data)
+        data = payload.raw
+        state = dpy_client._connection
+        guild_id: Optional[int] = payload.guild_id
+        channel_id: Optional[int] = payload.channel_id
+
+        guild: Optional[Guild] = dpy_client.get_guild(guild_id) if guild_id is not None else None
+        channel: Optional[Messageable] = (
+            guild.get_channel(channel_id) if guild is not None else dpy_client.get_channel(channel_id)
+        ) if channel_id is not None else None
+
+        if fetch:
+            guild_fetch = None
+            channel_fetch = None
+            if guild_id is not None and guild is None:
+                guild_fetch = utils.coalesce(('guild', guild_id), partial(dpy_client.fetch_guild, guild_id))
+            if channel_id is not None and channel is None:
+                channel_fetch = utils.coalesce(('channel', channel_id), partial(dpy_client.fetch_channel, channel_id))
+            if guild_fetch is not None and channel_fetch is not None:
+                guild, channel = await asyncio.gather(guild_fetch, channel_fetch)
+            elif guild_fetch is not None:
+                guild = await guild_fetch
+            elif channel_fetch is not None:
+                channel = await channel_fetch
+
+        member: Optional[Member] = None
+        if 'member' in data:
+            if guild is not None:
+                member = Member(data=data['member'], guild=guild, state=state)
+                user: Optional[User] = member._user
+            else:
+                user = User(data=data['member']['user'], state=state)
+        elif 'user' in data:
+            user = dpy_client.get_user(int(data['user']['id'])) or User(data=data['user'], state=state)
         else:
             user = None
-            member = None
 
         return cls(
-            id=data['id'],
-            application_id=data['application_id'],
-            token=data['token'],
-            version=data['version'],
+            id=payload.id,
+            application_id=payload.application_id,
+            token=payload.token,
+            type=payload.type,
+            version=payload.version,
             dpy_client=dpy_client,
             data=cls.parse_interaction_data(data['data']),
-            guild_id=data['guild_id'],
+            guild_id=guild_id,
             guild=guild,
-            channel_id=data['channel_id'],
+            channel_id=channel_id,
             channel=channel,
             member=member,
             user=user
@@ -268,18 +629,3 @@ class Interaction:
 
     async def build_context(self) -> InteractionContext:
         pass
-
-
-class InteractionResponseType(Enum):
-    Pong = 1  # ACK a ping
-    Acknowledge = 2  # @Deprecated ACK a command without sending a message, eating the user's input
-    ChannelMessage = 3  # @Deprecated respond with a message, eating the user's input
-    ChannelMessageWithSource = 4  # respond to an interaction with a message
-    DeferredChannelMessageWithSource = 5  # ACK an interaction and edit a response later, the user sees a loading state
-
-    @classmethod
-    def from_value(cls, value: int) -> Optional[InteractionResponseType]:
-        return next(
-            filter(lambda m: m.value == value, cls.__members__.values()),
-            None
-        )
@@ -1,39 +1,48 @@
 from __future__ import annotations
-from typing import List, Any, Union, Optional
 
-from discord import Message, User, Member
+import asyncio
+from collections import OrderedDict
+from logging import getLogger
+from typing import List, Any, Union, Optional, Dict, Set, Tuple, Iterator, TYPE_CHECKING
 
-from discord_buttons.button import ComponentType, Button
+from discord import Message, User, Member, NotFound
+
+from discord_buttons.button import Button
+from discord_buttons.component import ActionRow, ComponentType
+from discord_buttons.decoder import decoder
 from discord_buttons.type_hints import JSON
-from discord_buttons.utils import get_data_from_msg
+from discord_buttons.utils import get_data_from_msg, SingletonMeta
+from discord_buttons.waiter import ClickWaiters
+
+if TYPE_CHECKING:
+    from discord_buttons.context import ButtonContext
 
 __all__ = (
     'ComponentMessage',
+    'LazyComponentMessage',
+    'ComponentMessageCache',
     'parse_component',
     'parse_buttons'
 )
 
+btn_logger = getLogger('discord_buttons')
 
-def parse_component(components: List[JSON]) -> List[Any]:
-    objects: List[Any] = []
-    for component in components:
-        if component['type'] == ComponentType.Group:
-            objects.extend(parse_component(component['components']))
-        elif component['type'] == ComponentType.Button:
-            objects.append(Button.from_json(component))
 
-    return objects
+def parse_component(components: List[JSON]) -> List[Button]:
+    return decoder.flatten(components)
 
 
 def parse_buttons(components: List[JSON]) -> Union[List[List[Button]], List[Button]]:
-    buttons: List[Union[List[Button],Button]] = []
-    for component in components:
-        if component['type'] == ComponentType.Group:
-            buttons.append(parse_buttons(component['components']))
-        elif component['type'] == ComponentType.Button:
-            buttons.append(Button.from_json(component))
+    return decoder.decode(components)
 
-    return buttons
+
+def iter_buttons(rows: List[Union[List[Button], Button]]) -> Iterator[Button]:
+    """Iterate buttons in parsed components, flattening action rows."""
+    for row in rows:
+        if isinstance(row, list):
+            yield from row
+        else:
+            yield row
 
 
 class ComponentMessage(Message):
@@ -47,22 +56,265 @@ class ComponentMessage(Message):
 
     def __init__(self, *, state, channel, data: JSON):
         super(ComponentMessage, self).__init__(state=state, channel=channel, data=data)
-        components: Optional[List[JSON]] = data.get('components')
-        if components:
-            self._buttons: List[List[Button]] = parse_buttons(components)
-        else:
-            self._buttons = []
+        # Raw components are parsed on first access to ComponentMessage.buttons
+        self._components: List[JSON] = data.get('components') or []
+        self._buttons: Optional[List[List[Button]]] = None
+
+    def _update(self, data: JSON):
+        # Called by discord.py's 'MESSAGE_UPDATE' parser on cached messages.
+        super(ComponentMessage, self)._update(data)
+        if 'components' in data:
+            self._components = data['components'] or []
+            self._buttons = None
+            cache: ComponentMessageCache = ComponentMessageCache()
+            if self.id in cache:
+                # Re-index buttons of the message, dropping it if no button is left.
+                cache.remove(self.id)
+                cache.add(self)
 
     @property
     def buttons(self) -> List[List[Button]]:
+        if self._buttons is None:
+            self._buttons = parse_buttons(self._components) if self._components else []
         return self._buttons
 
     def get_button(self, custom_id: str) -> Optional[Button]:
         return next(filter(
             lambda btn: btn.custom_id == custom_id,
-            self._buttons
+            iter_buttons(self.buttons)
         ), None)    # Return None if no elements are found.
 
+    async def wait_for_click(
+            self,
+            custom_id: Optional[str] = None,
+            user: Optional[Union[User, Member, int]] = None,
+            timeout: Optional[float] = None
+    ) -> ButtonContext:
+        """
+        Wait for a click on this message's buttons.
+        :param custom_id: custom_id of the button to wait for. None matches any button on this message.
+        :param user: user (or user id) who should click the button. None matches anyone.
+        :param timeout: seconds to wait before raising asyncio.TimeoutError. None waits forever.
+        :return: ButtonContext of the click.
+        """
+        return await ClickWaiters().wait(self.id, custom_id, user, timeout)
+
+
+class LazyComponentMessage:
+    """
+    Proxy of :class:`ComponentMessage` which keeps the raw message payload.
+    Cheap attributes (id, channel, guild, content, buttons) are served from the payload, and the full
+    ComponentMessage is only constructed when any other attribute is accessed.
+    """
+    __slots__ = ('_state', 'channel', '_data', '_buttons', '_message')
+
+    def __init__(self, *, state, channel, data: JSON):
+        self._state = state
+        self.channel = channel
+        self._data: JSON = data
+        self._buttons: Optional[List[List[Button]]] = None
+        self._message: Optional[ComponentMessage] = None
+
+    def __getattr__(self, item: str) -> Any:
+        # Only called when the attribute is not served by the proxy itself.
+        return getattr(self.message, item)
+
+    def __repr__(self) -> str:
+        return '<LazyComponentMessage id={} channel={!r}>'.format(self.id, self.channel)
+
+    def __eq__(self, other) -> bool:
+        return getattr(other, 'id', None) == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    @property
+    def message(self) -> ComponentMessage:
+        """Fully constructed ComponentMessage. Built on first access."""
+        if self._message is None:
+            self._message = ComponentMessage(state=self._state, channel=self.channel, data=self._data)
+            if self._buttons is not None:
+                self._message._buttons = self._buttons
+        return self._message
+
+    @property
+    def id(self) -> int:
+        return int(self._data['id'])
+
+    @property
+    def content(self) -> str:
+        return self._data.get('content', '')
+
+    @property
+    def guild(self):
+        return getattr(self.channel, 'guild', None)
+
+    @property
+    def buttons(self) -> List[List[Button]]:
+        if self._message is not None:
+            return self._message.buttons
+        if self._buttons is None:
+            components: List[JSON] = self._data.get('components') or []
+            self._buttons = parse_buttons(components) if components else []
+        return self._buttons
+
+    def get_button(self, custom_id: str) -> Optional[Button]:
+        return next(filter(
+            lambda btn: btn.custom_id == custom_id,
+            iter_buttons(self.buttons)
+        ), None)
+
+    async def wait_for_click(
+            self,
+            custom_id: Optional[str] = None,
+            user: Optional[Union[User, Member, int]] = None,
+            timeout: Optional[float] = None
+    ) -> ButtonContext:
+        """
+        Wait for a click on this message's buttons.
+        :param custom_id: custom_id of the button to wait for. None matches any button on this message.
+        :param user: user (or user id) who should click the button. None matches anyone.
+        :param timeout: seconds to wait before raising asyncio.TimeoutError. None waits forever.
+        :return: ButtonContext of the click.
+        """
+        return await ClickWaiters().wait(self.id, custom_id, user, timeout)
+
+    def to_message_reference_dict(self) -> JSON:
+        data: JSON = {
+            'message_id': self.id,
+            'channel_id': self.channel.id
+        }
+        if self.guild is not None:
+            data['guild_id'] = self.guild.id
+        return data
+
+    async def reply(self, content=None, **kwargs) -> ComponentMessage:
+        return await self.channel.send(content, reference=self, **kwargs)
+
+
+def _disable_button(data: JSON, custom_id: str) -> JSON:
+    """Return copy of serialized component (or action row) with button of given custom_id disabled."""
+    if data.get('type') == ComponentType.Group.value:
+        return dict(data, components=[_disable_button(component, custom_id) for component in data['components']])
+    if data.get('custom_id') == custom_id:
+        return dict(data, disabled=True)
+    return data
+
+
+class _CachedComponents:
+    __slots__ = ('channel_id', 'rows', 'buttons')
+
+    def __init__(self, channel_id: int, rows: List[Union[List[Button], Button]]):
+        self.channel_id: int = channel_id
+        self.rows: List[Union[List[Button], Button]] = rows
+        self.buttons: Dict[str, Button] = {btn.custom_id: btn for btn in iter_buttons(rows) if btn.custom_id}
+
+
+class ComponentMessageCache(metaclass=SingletonMeta):
+    """
+    Index of sent messages carrying components.
+    Maps custom_id to ids of messages carrying it, and message id to its buttons by custom_id, so buttons of sent
+    messages can be found and edited without fetching the messages.
+    Like discord.py's message cache, oldest messages are evicted beyond ``max_messages``.
+    """
+    __slots__ = ('max_messages', '_messages', '_by_custom_id')
+
+    def __init__(self):
+        self.max_messages: Optional[int] = 1000
+        self._messages: OrderedDict[int, _CachedComponents] = OrderedDict()
+        self._by_custom_id: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._messages
+
+    def configure(self, max_messages: Optional[int] = 1000) -> None:
+        """
+        :param max_messages: maximum number of indexed messages. None to disable the cache.
+        """
+        self.max_messages = max_messages
+        if max_messages is None:
+            self.clear()
+        else:
+            self._trim()
+
+    def add(self, message: Union[ComponentMessage, LazyComponentMessage]) -> None:
+        """Index message if it has any button with custom_id."""
+        if self.max_messages is None:
+            return
+        entry = _CachedComponents(message.channel.id, message.buttons)
+        if not entry.buttons:
+            return
+        self.remove(message.id)
+        self._messages[message.id] = entry
+        for custom_id in entry.buttons:
+            self._by_custom_id.setdefault(custom_id, set()).add(message.id)
+        self._trim()
+
+    def remove(self, message_id: int) -> None:
+        entry: Optional[_CachedComponents] = self._messages.pop(message_id, None)
+        if entry is None:
+            return
+        for custom_id in entry.buttons:
+            message_ids: Optional[Set[int]] = self._by_custom_id.get(custom_id)
+            if message_ids is not None:
+                message_ids.discard(message_id)
+                if not message_ids:
+                    del self._by_custom_id[custom_id]
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._by_custom_id.clear()
+
+    def get_message_ids(self, custom_id: str) -> Tuple[int, ...]:
+        """Return ids of indexed messages carrying button with given custom_id."""
+        return tuple(self._by_custom_id.get(custom_id, ()))
+
+    def get_buttons(self, message_id: int) -> Dict[str, Button]:
+        """Return buttons of indexed message, by custom_id."""
+        entry: Optional[_CachedComponents] = self._messages.get(message_id)
+        return dict(entry.buttons) if entry is not None else {}
+
+    def get_button(self, message_id: int, custom_id: str) -> Optional[Button]:
+        entry: Optional[_CachedComponents] = self._messages.get(message_id)
+        return entry.buttons.get(custom_id) if entry is not None else None
 
+    def _trim(self) -> None:
+        while self.max_messages is not None and len(self._messages) > self.max_messages:
+            message_id = next(iter(self._messages))
+            self.remove(message_id)
 
+    async def disable_buttons(self, http, custom_id: str) -> List[int]:
+        """
+        Disable button with given custom_id on every indexed message carrying it, by editing the messages.
+        Messages which are not found anymore are dropped from the index. Other failed edits are logged.
+        :param http: discord.py's HTTPClient (client.http).
+        :param custom_id: custom_id of buttons to disable.
+        :return: ids of edited messages.
+        """
+        message_ids: Tuple[int, ...] = self.get_message_ids(custom_id)
+        edits = []
+        for message_id in message_ids:
+            entry: _CachedComponents = self._messages[message_id]
+            components: List[JSON] = [
+                _disable_button(ActionRow(row).to_json() if isinstance(row, list) else row.to_json(), custom_id)
+                for row in entry.rows
+            ]
+            edits.append(http.edit_message(entry.channel_id, message_id, components=components))
+        results: List[Any] = await asyncio.gather(*edits, return_exceptions=True)
 
+        edited: List[int] = []
+        for message_id, result in zip(message_ids, results):
+            if isinstance(result, NotFound):
+                self.remove(message_id)
+            elif isinstance(result, Exception):
+                btn_logger.warning('ComponentMessageCache : Failed to disable %s on message %s : %r', custom_id, message_id, result)
+            else:
+                # Cached view is updated only after its message is edited.
+                button: Optional[Button] = self.get_button(message_id, custom_id)
+                if button is not None:
+                    button.disabled = True
+                edited.append(message_id)
+        return edited
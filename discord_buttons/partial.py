@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Optional, Any
+
+from discord import Role
+from discord.abc import Messageable
+
+__all__ = (
+    'PartialGuild',
+    'PartialChannel'
+)
+
+
+class PartialGuild:
+    """
+    Guild known only by its id, built from interaction payload when the guild is not cached.
+    Cache lookups return None, so objects built on it (e.g. :class:`discord.Member`) work without guild cache.
+    Owner is unknown, so ``owner_id`` is None.
+    """
+    __slots__ = ('id', 'owner_id', 'permissions', '_state', '_default_role')
+
+    def __init__(self, state, id: int, permissions: Optional[int] = None):
+        """
+        :param state: discord.py's connection state.
+        :param id: id of the guild.
+        :param permissions: permissions of the interaction's member (``member.permissions`` of the payload).
+                            They back the @everyone role, so Member.guild_permissions reflects them.
+        """
+        self._state = state
+        self.id: int = id
+        self.owner_id: Optional[int] = None
+        self.permissions: int = permissions or 0
+        self._default_role: Optional[Role] = None
+
+    def __repr__(self) -> str:
+        return '<PartialGuild id={}>'.format(self.id)
+
+    def __eq__(self, other) -> bool:
+        return getattr(other, 'id', None) == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    @property
+    def default_role(self) -> Role:
+        """@everyone role, holding the member's permissions given by the payload."""
+        if self._default_role is None:
+            self._default_role = Role(guild=self, state=self._state, data={
+                'id': self.id,
+                'name': '@everyone',
+                'permissions_new': self.permissions    # discord.py 1.7 reads permissions from 'permissions_new'
+            })
+        return self._default_role
+
+    def get_role(self, role_id: int) -> None:
+        return None
+
+    def get_member(self, user_id: int) -> None:
+        return None
+
+    def get_channel(self, channel_id: int) -> None:
+        return None
+
+
+class PartialChannel(Messageable):
+    """
+    Channel known only by its id, built from interaction payload when the channel is not cached.
+    Supports everything :class:`discord.abc.Messageable` does (send, fetch_message, history, typing...).
+    """
+    __slots__ = ('id', 'guild', '_state')
+
+    def __init__(self, state, id: int, guild: Optional[Any] = None):
+        self._state = state
+        self.id: int = id
+        self.guild: Optional[Any] = guild
+
+    def __repr__(self) -> str:
+        return '<PartialChannel id={} guild={!r}>'.format(self.id, self.guild)
+
+    def __eq__(self, other) -> bool:
+        return getattr(other, 'id', None) == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    @property
+    def mention(self) -> str:
+        return '<#{}>'.format(self.id)
+
+    async def _get_channel(self) -> PartialChannel:
+        return self
@@ -1,38 +1,110 @@
-import json
 from logging import getLogger
-from typing import List, Union
+from typing import List, Union, Optional
 
-from discord import AllowedMentions, InvalidArgument, File, utils
+from aiohttp.payload import BytesPayload
+
+from discord import AllowedMentions, InvalidArgument, File
 from discord.abc import Messageable
 from discord.http import HTTPClient, Route
+from discord.state import ConnectionState
 
 # Backups
-from discord_buttons.button import ComponentType, Button
-from discord_buttons.message import ComponentMessage
+from discord_buttons import utils, instrumentation
+from discord_buttons.component import Component, ComponentType, ActionRow
+from discord_buttons.message import ComponentMessage, ComponentMessageCache
 from discord_buttons.type_hints import JSON
+from discord_buttons.upload import FilePayload
 
 btn_logger = getLogger('discord_buttons')
 
 Messageable_send = Messageable.send
 HTTTPClient_send_message = HTTPClient.send_message
 Route_BASE = Route.BASE
+ConnectionState_parse_message_create = ConnectionState.parse_message_create
+ConnectionState_parse_message_delete = ConnectionState.parse_message_delete
+ConnectionState_parse_message_delete_bulk = ConnectionState.parse_message_delete_bulk
 
 # Helper func
-def _pack_component(type: int, btn: Button) -> JSON:
-    component: JSON = {'type': type}
-    if type == 1:
-        component.update({
-                "type": type,
-                "components": [
-                    {
-                        "type": 2,
-                        "style": btn.style,
-                        "label": btn.label,
-                        "custom_id": btn.custom_id,
-                        "url": btn.url,
-                    }
-                ],
-            })
+def _cache_message(state: ConnectionState, message: ComponentMessage) -> None:
+    """
+    Store sent message in discord.py's message cache, replacing the entry of the same message if gateway's
+    'MESSAGE_CREATE' event arrived first, so that the message is not cached twice.
+    """
+    messages = state._messages
+    if messages is None:
+        return
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].id == message.id:
+            messages[index] = message
+            return
+    messages.append(message)
+
+
+def parse_message_create(self: ConnectionState, data: JSON):
+    """
+    Wraps discord.py's 'MESSAGE_CREATE' parser. If the bot's own message was already cached by send, keep the
+    ComponentMessage instead of appending a plain Message for it.
+    """
+    ConnectionState_parse_message_create(self, data)
+    messages = self._messages
+    if messages and int(data['author']['id']) == self.self_id:
+        message_id: int = int(data['id'])
+        for index in range(len(messages) - 2, -1, -1):
+            if messages[index].id == message_id:
+                messages.pop()
+                return
+
+
+def _pack_rows(components: List[Union[Component, List[Component], JSON]]) -> List[Union[ActionRow, JSON]]:
+    """
+    Pack components into action rows. Components can be a flat list (single row), or a list of rows.
+    Raw component dicts (action rows in discord's json form) are passed through as they are.
+    """
+    if not len(components):
+        return []
+    if any(isinstance(component, dict) for component in components):
+        if not all(isinstance(component, dict) for component in components):
+            raise TypeError('Raw component dicts cannot be mixed with Component objects in components.')
+        return list(components)
+    if all(isinstance(component, ActionRow) for component in components):
+        return list(components)
+    if isinstance(components[0], Component) and components[0].type != ComponentType.Group:
+        # Not a nested component array. Pack with a single row.
+        return [ActionRow(components)]
+    return [
+        line if isinstance(line, ActionRow) else ActionRow(line)
+        for line in components
+    ]
+
+
+def _dump_payload(payload: JSON, components: Optional[List[Union[ActionRow, JSON]]] = None) -> bytes:
+    """
+    Encode payload in json. Cached json of component objects is spliced in, instead of serializing them again.
+    """
+    if not components:
+        return utils.json_dumps(payload)
+    if not isinstance(components[0], Component):
+        # Raw component dicts.
+        return utils.json_dumps(dict(payload, components=components))
+
+    encoded: bytes = utils.json_dumps(payload)
+    rows: bytes = b','.join(row.to_json_bytes() for row in components)
+    separator: bytes = b',' if len(encoded) > 2 else b''
+    return b'%s%s"components":[%s]}' % (encoded[:-1], separator, rows)
+
+def parse_message_delete(self: ConnectionState, data: JSON):
+    """Wraps discord.py's 'MESSAGE_DELETE' parser, to drop deleted message from ComponentMessageCache."""
+    ConnectionState_parse_message_delete(self, data)
+    ComponentMessageCache().remove(int(data['id']))
+
+
+def parse_message_delete_bulk(self: ConnectionState, data: JSON):
+    """Wraps discord.py's 'MESSAGE_DELETE_BULK' parser, to drop deleted messages from ComponentMessageCache."""
+    ConnectionState_parse_message_delete_bulk(self, data)
+    cache: ComponentMessageCache = ComponentMessageCache()
+    for message_id in data['ids']:
+        cache.remove(int(message_id))
+
 
 # Replace methods
 # 'send' method in 'discord.abc.Messageable'
@@ -106,8 +178,8 @@ async def send(
                 If set, overrides the :attr:`~discord.AllowedMentions.replied_user` attribute of ``allowed_mentions``.
 
             # New parameters added in discord_buttons
-            components: Optional[List[:class:'~discord_buttons.Button']]
-                List of Button objects to send with message.
+            components: Optional[Union[List[:class:'~discord_buttons.Button'], List[List[:class:'~discord_buttons.Button']], List[:class:'~discord_buttons.ActionRow']]]
+                List of Button objects to send with message, or list of rows of them.
 
             Raises
             --------
@@ -152,30 +224,11 @@ async def send(
             raise InvalidArgument('reference parameter must be Message or MessageReference') from None
 
     # Added in discord_buttons to support discord buttons feature.
-    # buttons : Union[List[Button], Button]
-    parsed_components: List[JSON] = []
+    # buttons : Union[List[Button], List[List[Button]], List[ActionRow]]
+    parsed_components: List[ActionRow] = []
     if components is not None:
-        btn_logger.debug('discord.abc.Messageable.send#patched > Parsing components : {}'.format(components))
-        if not len(components):
-            parsed_components = []
-        elif not components[0].type == ComponentType.Group:     # Not a nested component array.
-            # Pack with list
-            parsed_components = [{
-                'type': ComponentType.Group.value,
-                'components': [component.to_json() for component in components]
-            }]
-        else:
-            parsed_components = [
-                {
-                    'type': ComponentType.Group.value,
-                    'components': [
-                        component.to_json()
-                        for component in line
-                    ]
-                }
-                for line in components
-            ]
-        btn_logger.debug('discord.abc.Messageable.send#patched > Parsed buttons into components : {}'.format(parsed_components))
+        parsed_components = _pack_rows(components)
+        btn_logger.debug('discord.abc.Messageable.send#patched > Packed buttons into rows : %s', parsed_components)
 
     if file is not None and files is not None:
         raise InvalidArgument('cannot pass both file and files parameter to send()')
@@ -209,17 +262,17 @@ async def send(
                                              nonce=nonce, allowed_mentions=allowed_mentions,
                                              message_reference=reference, components=parsed_components)
 
-    ret = state.create_message(channel=channel, data=data)
-    if delete_after is not None:
-        await ret.delete(delay=delete_after)
-
-    print('patched send debug : packing with ButtonMessage object...')
-    print(json.dumps(data, ensure_ascii=False, indent=2))
-    if 'message_reference' in data:
+    if 'message_reference' in data and 'referenced_message' in data:
         # Issue : 'message_reference' object in message response data lacks 'channel_id', so copy it from object 'referenced_message'.
-        data['message_reference']['channel_id'] = data['referenced_message']['channel_id']
+        data['message_reference'].setdefault('channel_id', data['referenced_message']['channel_id'])
+
+    # Build message once from the response, and cache it like discord.py does for received messages.
+    btn_msg: ComponentMessage = ComponentMessage(state=state, channel=channel, data=data)
+    _cache_message(state, btn_msg)
+    ComponentMessageCache().add(btn_msg)
 
-    btn_msg: ComponentMessage = ComponentMessage.fromMessage(ret, data)
+    if delete_after is not None:
+        await btn_msg.delete(delay=delete_after)
     return btn_msg
 
 
@@ -257,8 +310,8 @@ def send_message(
     if message_reference:
         payload['message_reference'] = message_reference
 
-    if components:
-        r"""
+    # Components are spliced into the encoded payload by _dump_payload. Example of the request body :
+    r"""
 {
   "content": "buttons!",
   "components": [
@@ -299,12 +352,17 @@ def send_message(
     }
   ]
 }
-        """
-        btn_logger.debug('components : {}'.format(components))
-        payload['components'] = components
-        btn_logger.debug('payload : {}'.format(json.dumps(payload, ensure_ascii=False, indent=2)))
+    """
 
-    return self.request(r, json=payload)
+    body: bytes = _dump_payload(payload, components)
+    btn_logger.debug('payload : %s', body)
+    if instrumentation.tracer is not None:
+        instrumentation.tracer('send_message', {
+            'channel_id': channel_id,
+            'components': len(components) if components else 0,
+            'bytes': len(body)
+        })
+    return self.request(r, data=BytesPayload(body, content_type='application/json'))
 
 
 # 'send_files' method in 'discord.http.HTTPClient'
@@ -335,15 +393,20 @@ def send_files(
         payload['allowed_mentions'] = allowed_mentions
     if message_reference:
         payload['message_reference'] = message_reference
-    if components:
-        payload['components'] = components
 
-    form.append({'name': 'payload_json', 'value': utils.to_json(payload)})
+    form.append({'name': 'payload_json', 'value': _dump_payload(payload, components).decode('utf-8')})
+    if instrumentation.tracer is not None:
+        instrumentation.tracer('send_files', {
+            'channel_id': channel_id,
+            'components': len(components) if components else 0,
+            'files': len(files)
+        })
+    # Files are streamed by FilePayload, which restarts from the original position of the file on retries.
     if len(files) == 1:
         file = files[0]
         form.append({
             'name': 'file',
-            'value': file.fp,
+            'value': FilePayload(file),
             'filename': file.filename,
             'content_type': 'application/octet-stream'
         })
@@ -351,7 +414,7 @@ def send_files(
         for index, file in enumerate(files):
             form.append({
                 'name': 'file%s' % index,
-                'value': file.fp,
+                'value': FilePayload(file),
                 'filename': file.filename,
                 'content_type': 'application/octet-stream'
             })
@@ -364,10 +427,16 @@ def update():
     Messageable.send = send
     HTTPClient.send_message = send_message
     HTTPClient.send_files = send_files
+    ConnectionState.parse_message_create = parse_message_create
+    ConnectionState.parse_message_delete = parse_message_delete
+    ConnectionState.parse_message_delete_bulk = parse_message_delete_bulk
     Route.BASE = 'https://discord.com/api/v8'
 
 
 def check():
     print('Is Messageable.send is patched? : {}'.format(Messageable.send is send))
     print('Is HTTPClient.send_message is patched? : {}'.format(HTTPClient.send_message is send_message))
-    print('Is HTTPClient.send_files is patched? : {}'.format(HTTPClient.send_files is send_files))
\ No newline at end of file
+    print('Is HTTPClient.send_files is patched? : {}'.format(HTTPClient.send_files is send_files))
+    print('Is ConnectionState.parse_message_create is patched? : {}'.format(ConnectionState.parse_message_create is parse_message_create))
+    print('Is ConnectionState.parse_message_delete is patched? : {}'.format(ConnectionState.parse_message_delete is parse_message_delete))
+    print('Is ConnectionState.parse_message_delete_bulk is patched? : {}'.format(ConnectionState.parse_message_delete_bulk is parse_message_delete_bulk))
\ No newline at end of file
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from logging import getLogger
+from typing import Optional, Deque, List, TYPE_CHECKING
+
+from discord_buttons.type_hints import JSON
+
+if TYPE_CHECKING:
+    from discord_buttons.button import Button
+    from discord_buttons.context import ButtonContext
+
+__all__ = (
+    'ClickStream',
+)
+
+btn_logger = getLogger('discord_buttons')
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+
+class ClickStream:
+    """
+    Async iterator of a button's clicks, buffered in a bounded ring buffer.
+    When the buffer is full, the oldest ('drop_oldest') or the incoming ('drop_newest') click is dropped.
+    Dropped clicks are acknowledged in background, so that their interaction does not fail on user's client.
+
+    ```python
+    async with button.clicks(maxsize=100) as stream:
+        async for ctx in stream:
+            ...
+    ```
+    """
+    __slots__ = ('button', 'maxsize', 'overflow', 'received', 'dropped', '_buffer', '_waiter', '_closed', '__weakref__')
+
+    def __init__(self, button: Button, maxsize: int = 100, overflow: str = 'drop_oldest'):
+        if maxsize < 1:
+            raise ValueError('maxsize must be a positive integer.')
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('overflow must be one of {}, not {}'.format(OVERFLOW_POLICIES, overflow))
+        self.button: Button = button
+        self.maxsize: int = maxsize
+        self.overflow: str = overflow
+        self.received: int = 0
+        self.dropped: int = 0
+        self._buffer: Deque[ButtonContext] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed: bool = False
+
+    def __repr__(self) -> str:
+        return '<ClickStream button={} buffered={} received={} dropped={}>'.format(
+            self.button.custom_id, len(self._buffer), self.received, self.dropped
+        )
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, ctx: ButtonContext) -> None:
+        """
+        Buffer a click. Called by Button.invoke.
+        :param ctx: ButtonContext of the click.
+        """
+        if self._closed:
+            return
+        self.received += 1
+        if len(self._buffer) >= self.maxsize:
+            self.dropped += 1
+            if self.overflow == 'drop_oldest':
+                self._drop(self._buffer.popleft())
+                self._buffer.append(ctx)
+            else:
+                self._drop(ctx)
+        else:
+            self._buffer.append(ctx)
+        self._wakeup()
+
+    def drain(self) -> List[ButtonContext]:
+        """
+        Take every buffered click at once, without waiting.
+        :return: buffered clicks, oldest first.
+        """
+        batch: List[ButtonContext] = list(self._buffer)
+        self._buffer.clear()
+        return batch
+
+    async def get(self) -> ButtonContext:
+        """
+        Wait for the next click.
+        :raise StopAsyncIteration: stream is closed and its buffer is empty.
+        """
+        while not self._buffer:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._buffer.popleft()
+
+    def close(self) -> None:
+        """Stop receiving clicks. Clicks already buffered are still yielded."""
+        if self._closed:
+            return
+        self._closed = True
+        self.button._remove_stream(self)
+        self._wakeup()
+
+    def stats(self) -> JSON:
+        return {
+            'buffered': len(self._buffer),
+            'maxsize': self.maxsize,
+            'received': self.received,
+            'dropped': self.dropped
+        }
+
+    def _wakeup(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _drop(self, ctx: ButtonContext) -> None:
+        btn_logger.debug('ClickStream : dropped a click on %s (%d dropped)', self.button.custom_id, self.dropped)
+        if not ctx.responded:
+            asyncio.ensure_future(ctx.respond())
+
+    def __aiter__(self) -> ClickStream:
+        return self
+
+    async def __anext__(self) -> ButtonContext:
+        return await self.get()
+
+    async def __aenter__(self) -> ClickStream:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from time import monotonic
+from typing import Optional, List, Any
+
+from discord_buttons.type_hints import Function
+
+__all__ = (
+    'TimerHandle',
+    'TimerWheel'
+)
+
+btn_logger = getLogger('discord_buttons')
+
+
+class TimerHandle:
+    """Scheduled callback in a TimerWheel. Cancelled handles are skipped when their slot is reached."""
+    __slots__ = ('rounds', 'callback', 'args', 'cancelled')
+
+    def __init__(self, rounds: int, callback: Function, args: tuple):
+        self.rounds: int = rounds
+        self.callback: Function = callback
+        self.args: tuple = args
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel.
+    Scheduling and cancelling are O(1) regardless of the number of pending timers, and a single task drives
+    every timer, instead of one asyncio timer handle per scheduled callback.
+    Timers fire with up to ``resolution`` seconds of delay.
+    """
+    __slots__ = ('resolution', '_slots', '_cursor', '_pending', '_last_tick', '_task')
+
+    def __init__(self, resolution: float = 0.1, size: int = 512):
+        """
+        :param resolution: duration of a tick in seconds.
+        :param size: number of slots in the wheel. Timers longer than resolution * size wrap around the wheel.
+        """
+        self.resolution: float = resolution
+        self._slots: List[List[TimerHandle]] = [[] for _ in range(size)]
+        self._cursor: int = 0
+        self._pending: int = 0
+        self._last_tick: float = monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def schedule(self, delay: float, callback: Function, *args: Any) -> TimerHandle:
+        """
+        Call callback(*args) after delay seconds. Must be called inside the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._last_tick = monotonic()
+            self._task = asyncio.ensure_future(self._run())
+
+        ticks: int = max(1, int(delay / self.resolution + 0.5))
+        rounds, offset = divmod(ticks, len(self._slots))
+        if offset == 0:
+            rounds, offset = rounds - 1, len(self._slots)
+        handle = TimerHandle(rounds, callback, args)
+        self._slots[(self._cursor + offset) % len(self._slots)].append(handle)
+        self._pending += 1
+        return handle
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for slot in self._slots:
+            slot.clear()
+        self._pending = 0
+
+    def _tick(self) -> None:
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot: List[TimerHandle] = self._slots[self._cursor]
+        if not slot:
+            return
+        remaining: List[TimerHandle] = []
+        for handle in slot:
+            if handle.cancelled:
+                self._pending -= 1
+            elif handle.rounds > 0:
+                handle.rounds -= 1
+                remaining.append(handle)
+            else:
+                self._pending -= 1
+                try:
+                    handle.callback(*handle.args)
+                except Exception:
+                    btn_logger.exception('TimerWheel : Ignoring exception in timer callback.')
+        self._slots[self._cursor] = remaining
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.resolution)
+            now = monotonic()
+            # Catch up on ticks missed while the event loop was busy.
+            while now - self._last_tick >= self.resolution:
+                self._last_tick += self.resolution
+                self._tick()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import mmap
+import os
+from typing import Any, Optional
+
+from aiohttp.payload import Payload
+from discord import File
+
+__all__ = (
+    'FilePayload',
+)
+
+
+class FilePayload(Payload):
+    """
+    Multipart payload streaming a :class:`discord.File` without buffering it.
+    Files on disk are memory-mapped and in-memory files (BytesIO) are exposed through their buffer, so only one
+    chunk is copied at a time, instead of reading the whole file into memory.
+    Each chunk is handed to the transport as bytes : some transports (asyncio's selector transport on 3.12+, uvloop)
+    keep the buffer they are given after a partial send, and the mapping must not be closed while they hold a view
+    of it.
+    Every write starts again from the file's original position, so retried requests resend the same content
+    without re-buffering. Other file-like objects are read in chunks in the default executor.
+    """
+
+    CHUNK_SIZE: int = 2 ** 16
+
+    def __init__(self, file: File, **kwargs: Any):
+        fp = file.fp
+        self._start: int = fp.tell()
+        self._fileno: Optional[int] = None
+        try:
+            self._fileno = fp.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+
+        if self._fileno is not None:
+            size: Optional[int] = os.fstat(self._fileno).st_size - self._start
+        elif isinstance(fp, io.BytesIO):
+            size = fp.getbuffer().nbytes - self._start
+        else:
+            size = None
+
+        kwargs.setdefault('content_type', 'application/octet-stream')
+        super(FilePayload, self).__init__(fp, filename=file.filename, **kwargs)
+        self._size = size
+
+    async def write(self, writer: Any) -> None:
+        if self._size == 0:
+            return
+        if self._fileno is not None:
+            await self._write_mmap(writer)
+        elif isinstance(self._value, io.BytesIO):
+            with self._value.getbuffer() as buffer:
+                await self._write_view(writer, buffer)
+        else:
+            await self._write_chunks(writer)
+
+    async def _write_view(self, writer: Any, buffer: memoryview) -> None:
+        with buffer[self._start:] as view:
+            for offset in range(0, len(view), self.CHUNK_SIZE):
+                with view[offset:offset + self.CHUNK_SIZE] as chunk:
+                    await writer.write(bytes(chunk))    # Bounded copy, so no view of the buffer outlives it.
+
+    async def _write_mmap(self, writer: Any) -> None:
+        try:
+            mapped = mmap.mmap(self._fileno, 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Not mappable (e.g. pipe or special file).
+            await self._write_chunks(writer)
+            return
+        with mapped, memoryview(mapped) as buffer:
+            await self._write_view(writer, buffer)
+
+    async def _write_chunks(self, writer: Any) -> None:
+        loop = asyncio.get_event_loop()
+        fp = self._value
+        await loop.run_in_executor(None, fp.seek, self._start)
+        chunk = await loop.run_in_executor(None, fp.read, self.CHUNK_SIZE)
+        while chunk:
+            await writer.write(chunk)
+            chunk = await loop.run_in_executor(None, fp.read, self.CHUNK_SIZE)
@@ -1,10 +1,101 @@
+import asyncio
+import json
+from logging import getLogger
 from mailbox import Message
-from typing import Dict
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
 
 from discord import Member, User
 
 from discord_buttons.type_hints import JSON
 
+btn_logger = getLogger('discord_buttons')
+
+
+# JSON backend
+# Encoders return utf-8 encoded bytes, so they can be sent as request body as-is.
+# Access them as attributes of this module (utils.json_dumps), since use_json_backend() rebinds them.
+def _stdlib_dumps(obj: Any, pretty: bool = False) -> bytes:
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=True).encode('utf-8')
+
+
+def _load_stdlib() -> Tuple[Callable[..., bytes], Callable[[Any], Any]]:
+    return _stdlib_dumps, json.loads
+
+
+def _load_orjson() -> Tuple[Callable[..., bytes], Callable[[Any], Any]]:
+    import orjson
+
+    def dumps(obj: Any, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return dumps, orjson.loads
+
+
+def _load_ujson() -> Tuple[Callable[..., bytes], Callable[[Any], Any]]:
+    import ujson
+
+    def dumps(obj: Any, pretty: bool = False) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, indent=2 if pretty else 0).encode('utf-8')
+    return dumps, ujson.loads
+
+
+_JSON_BACKENDS: Dict[str, Callable[[], Tuple[Callable[..., bytes], Callable[[Any], Any]]]] = {
+    'orjson': _load_orjson,
+    'ujson': _load_ujson,
+    'json': _load_stdlib
+}
+
+json_backend: str = 'json'
+json_dumps: Callable[..., bytes] = _stdlib_dumps
+json_loads: Callable[[Any], Any] = json.loads
+
+
+def use_json_backend(name: Optional[str] = None) -> str:
+    """
+    Select json backend used to encode and decode payloads.
+    :param name: 'orjson', 'ujson' or 'json'. If None, the fastest installed backend is selected.
+    :return: name of the selected backend. Falls back to 'json' (stdlib) if requested backend is not installed.
+    """
+    global json_backend, json_dumps, json_loads
+    if name is not None and name not in _JSON_BACKENDS:
+        raise ValueError('Unknown json backend : {}. Available backends are {}.'.format(name, tuple(_JSON_BACKENDS)))
+
+    for candidate in ((name,) if name is not None else ('orjson', 'ujson', 'json')):
+        try:
+            json_dumps, json_loads = _JSON_BACKENDS[candidate]()
+        except ImportError:
+            if name is not None:
+                btn_logger.warning('json backend %s is not installed. Falling back to stdlib json.', name)
+            continue
+        json_backend = candidate
+        return json_backend
+
+    json_backend = 'json'
+    json_dumps, json_loads = _load_stdlib()
+    return json_backend
+
+
+use_json_backend()
+
+
+# In-flight request coalescing
+_inflight: Dict[Any, asyncio.Future] = {}
+
+
+async def coalesce(key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Await result of factory(), sharing one in-flight call between concurrent callers with the same key.
+    :param key: hashable key identifying the request (e.g. ('guild', guild_id)).
+    :param factory: function returning awaitable to run when no request with the key is in flight.
+    """
+    future: Optional[asyncio.Future] = _inflight.get(key)
+    if future is None:
+        future = _inflight[key] = asyncio.ensure_future(factory())
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Cancelling one caller must not cancel the request shared with others.
+    return await asyncio.shield(future)
+
 
 class SingletonMeta(type):
     __instances__: Dict = {}
@@ -15,6 +106,81 @@ class SingletonMeta(type):
         return cls.__instances__[cls]
 
 
+class PrefixTree:
+    """
+    Character trie mapping string prefixes to values.
+    Lookup walks the key once, so its cost depends on len(key), not on the number of registered prefixes.
+    """
+    __slots__ = ('_root', '_size')
+
+    _END = None    # Key of the value slot in each node. Never collides with a 1-length str key.
+
+    def __init__(self):
+        self._root: Dict[Optional[str], Any] = {}
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, prefix: str, value: Any) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if self._END not in node:
+            self._size += 1
+        node[self._END] = value
+
+    def remove(self, prefix: str) -> Optional[Any]:
+        path = []
+        node = self._root
+        for char in prefix:
+            child = node.get(char)
+            if child is None:
+                return None
+            path.append((node, char))
+            node = child
+        if self._END not in node:
+            return None
+        value = node.pop(self._END)
+        self._size -= 1
+        # Prune empty branches.
+        while path and not node:
+            parent, char = path.pop()
+            del parent[char]
+            node = parent
+        return value
+
+    def longest_prefix(self, key: str) -> Optional[Tuple[str, Any]]:
+        """
+        Find the longest registered prefix of the key.
+        :param key: string to match.
+        :return: tuple of (prefix, value), or None if no registered prefix matches.
+        """
+        node = self._root
+        found = None
+        if self._END in node:
+            found = (0, node[self._END])
+        for index, char in enumerate(key):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node:
+                found = (index + 1, node[self._END])
+        if found is None:
+            return None
+        return key[:found[0]], found[1]
+
+    def items(self):
+        stack = [('', self._root)]
+        while stack:
+            prefix, node = stack.pop()
+            for char, child in node.items():
+                if char is self._END:
+                    yield prefix, child
+                else:
+                    stack.append((prefix + char, child))
+
+
 def get_data_from_user(user: User) -> JSON:
     data: JSON = {
         'username': user.name,
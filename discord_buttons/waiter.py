@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from typing import Optional, Dict, List, Tuple, Union, TYPE_CHECKING
+
+import discord
+
+from discord_buttons.utils import SingletonMeta
+
+if TYPE_CHECKING:
+    from discord_buttons.context import ButtonContext
+
+__all__ = (
+    'ClickWaiter',
+    'ClickWaiters'
+)
+
+btn_logger = getLogger('discord_buttons')
+
+WaiterKey = Tuple[Optional[int], Optional[str]]
+
+
+def _user_id(user: Optional[Union[discord.abc.Snowflake, int]]) -> Optional[int]:
+    if user is None or isinstance(user, int):
+        return user
+    return user.id
+
+
+class ClickWaiter:
+    """Pending wait for a button click. Resolved with the ButtonContext of the matching click."""
+    __slots__ = ('key', 'user_id', 'future')
+
+    def __init__(self, key: WaiterKey, user_id: Optional[int], future: asyncio.Future):
+        self.key: WaiterKey = key
+        self.user_id: Optional[int] = user_id
+        self.future: asyncio.Future = future
+
+    def matches(self, ctx: ButtonContext) -> bool:
+        return self.user_id is None or self.user_id == ctx.user.id
+
+
+class ClickWaiters(metaclass=SingletonMeta):
+    """
+    Registry of pending click waiters, keyed by (message_id, custom_id).
+    Either part of the key may be None, which matches any message or any button.
+    Resolving a click looks up at most 3 keys, so its cost does not grow with the number of pending waiters,
+    unlike discord.Client.wait_for which checks every pending predicate.
+    """
+    __slots__ = ('_waiters',)
+
+    def __init__(self):
+        self._waiters: Dict[WaiterKey, List[ClickWaiter]] = {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self._waiters.values()))
+
+    def __contains__(self, key: WaiterKey) -> bool:
+        return key in self._waiters
+
+    async def wait(
+            self,
+            message_id: Optional[int] = None,
+            custom_id: Optional[str] = None,
+            user: Optional[Union[discord.abc.Snowflake, int]] = None,
+            timeout: Optional[float] = None
+    ) -> ButtonContext:
+        """
+        Wait for a click matching given message and button.
+        :param message_id: id of the message to wait for. None matches any message.
+        :param custom_id: custom_id of the button to wait for. None matches any button.
+        :param user: user (or user id) who should click the button. None matches anyone.
+        :param timeout: seconds to wait before raising asyncio.TimeoutError. None waits forever.
+        :return: ButtonContext of the click.
+        """
+        if message_id is None and custom_id is None:
+            raise ValueError('At least one of message_id or custom_id must be given.')
+
+        key: WaiterKey = (message_id, custom_id)
+        waiter: ClickWaiter = ClickWaiter(key, _user_id(user), asyncio.get_event_loop().create_future())
+        self._waiters.setdefault(key, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter.future, timeout)
+        finally:
+            self._discard(waiter)
+
+    def has_waiters(self, message_id: Optional[int], custom_id: Optional[str]) -> bool:
+        """Check if any waiter may match a click on the given message and button."""
+        if not self._waiters:
+            return False
+        waiters = self._waiters
+        return (message_id, custom_id) in waiters or (message_id, None) in waiters or (None, custom_id) in waiters
+
+    def resolve(self, ctx: ButtonContext) -> int:
+        """
+        Resolve waiters matching a click.
+        :param ctx: ButtonContext of the click.
+        :return: number of waiters resolved.
+        """
+        if not self._waiters:
+            return 0
+
+        message_id: Optional[int] = ctx.payload.message_id
+        custom_id: str = ctx.payload.custom_id
+        resolved: int = 0
+        for key in ((message_id, custom_id), (message_id, None), (None, custom_id)):
+            waiters: Optional[List[ClickWaiter]] = self._waiters.get(key)
+            if not waiters:
+                continue
+            for waiter in waiters:
+                if not waiter.future.done() and waiter.matches(ctx):
+                    waiter.future.set_result(ctx)
+                    resolved += 1
+        if resolved:
+            ctx.waited = True
+            btn_logger.debug('ClickWaiters : resolved %d waiter(s) for %s', resolved, custom_id)
+        return resolved
+
+    def cancel_all(self) -> None:
+        """Cancel every pending waiter. Called when the client is closed."""
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                waiter.future.cancel()
+        self._waiters.clear()
+
+    def _discard(self, waiter: ClickWaiter) -> None:
+        waiters: Optional[List[ClickWaiter]] = self._waiters.get(waiter.key)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiters[waiter.key]
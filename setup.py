@@ -26,6 +26,11 @@ setup(
     packages=find_packages(),
     # Dependencies : This project depends on module 'discord.py'
     install_requires=["discord.py>=1.7.1"],
+    # Optional faster json backends : pip install discord.py-buttons[orjson]
+    extras_require={
+        "orjson": ["orjson"],
+        "ujson": ["ujson"]
+    },
     # Module`s python requirement
     python_requires=">=3.7",
     # Keywords about the module